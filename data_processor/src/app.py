@@ -3,6 +3,7 @@ from pdf_processor import app as pdf_processor
 from excel_processor import app as excel_processor
 from pdf_config import app as pdf_config
 from excel_config import app as excel_config
+from reg_lookup import app as reg_lookup
 from typing import Dict
 
 
@@ -40,6 +41,7 @@ def main_app() -> None:
         "Excel Processor": "excel_processor",
         "PDF Config": "pdf_config",
         "Excel Config": "excel_config",
+        "Vehicle Lookup": "reg_lookup",
     }
 
     # Add a selectbox to the sidebar for navigation
@@ -53,6 +55,8 @@ def main_app() -> None:
         pdf_processor()
     elif selected_app == "Excel Processor":
         excel_processor()
+    elif selected_app == "Vehicle Lookup":
+        reg_lookup()
 
 
 if "logged_in" not in st.session_state:
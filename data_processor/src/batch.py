@@ -0,0 +1,361 @@
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+import traceback
+import pandas as pd
+from io import StringIO
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+from config_service import get_config_text
+from excel_processor import read_mapped_columns
+from council_config import parse_pdf_config
+from manifest import (
+    config_hash,
+    entry_key,
+    hash_file,
+    is_stale,
+    load_manifest,
+    make_entry,
+    save_manifest,
+)
+from instrumentation import PipelineTrace, log_trace
+from pdf_processor import process_pdf_to_file
+from reg_index import index_rows, upsert_councils
+from variables import REG_INDEX_PATH
+
+DEFAULT_DIRECTORIES: List[str] = ["pdf_files/tabular", "excel_files"]
+DEFAULT_PDF_CONFIG: str = "data_processor/data/pdf_config.csv"
+DEFAULT_EXCEL_MAPPINGS: str = "data_processor/data/excel_mappings.csv"
+DEFAULT_OUTPUT_DIR: str = "output"
+
+
+def configure_logging() -> None:
+    """
+    Send INFO log records, such as pipeline traces, to stderr as bare
+    messages. Also run in each worker process, which may not inherit the
+    configuration of the parent.
+    """
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stderr)
+
+
+def load_config_text(path: Optional[str], file_name: str) -> str:
+    """
+    Read a config file from a path, or the shared config the app pages use.
+
+    Args:
+        path (Optional[str]): Path to the config CSV, or None for the shared
+            config, read from the bucket with a fallback to the last local copy.
+        file_name (str): Name of the shared config file.
+
+    Returns:
+        str: Content of the config file.
+    """
+    if path is None:
+        return get_config_text(file_name)
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def find_sources(directories: List[str]) -> List[Dict[str, str]]:
+    """
+    Find the council PDF and Excel files in a list of directories.
+
+    Args:
+        directories (List[str]): Directories to search, not recursively.
+
+    Returns:
+        List[Dict[str, str]]: One entry per file with its council, kind and path.
+    """
+    sources = []
+    for directory in directories:
+        for file_name in sorted(os.listdir(directory)):
+            council, extension = os.path.splitext(file_name)
+            kind = {".pdf": "pdf", ".xlsx": "excel"}.get(extension.lower())
+            if kind is not None:
+                sources.append(
+                    {
+                        "council": council,
+                        "kind": kind,
+                        "path": os.path.join(directory, file_name),
+                    }
+                )
+    return sources
+
+
+def process_source(
+    source: Dict[str, str], output_path: str, config: Any
+) -> Dict[str, Any]:
+    """
+    Process one council file and write its output, recording the outcome.
+
+    Args:
+        source (Dict[str, str]): Source entry from find_sources.
+        output_path (str): Path of the CSV file to write.
+        config (Any): The council's CouncilConfig for PDF sources, or the Excel
+            column mappings DataFrame for Excel sources.
+
+    Returns:
+        Dict[str, Any]: Summary of the run with rows written, duration, error and
+            the measurements of each pipeline stage.
+    """
+    start = time.perf_counter()
+    result: Dict[str, Any] = {**source, "output": output_path, "rows": 0}
+    trace = PipelineTrace()
+    try:
+        if source["kind"] == "pdf":
+            result["rows"] = process_pdf_to_file(
+                source["path"], output_path, config, trace=trace
+            )
+        else:
+            df = trace.run(
+                "read_mapped_columns", read_mapped_columns, source["path"], config
+            )
+            if "reg" not in df.columns:
+                raise ValueError("'reg' column is missing from the processed data.")
+            df.to_csv(output_path, index=False)
+            result["rows"] = len(df)
+        result["error"] = None
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        result["traceback"] = traceback.format_exc()
+    result["duration_s"] = round(time.perf_counter() - start, 3)
+    result["stages"] = trace.to_records()
+    log_trace(
+        trace,
+        kind=source["kind"],
+        council=source["council"],
+        file=source["path"],
+        rows=result["rows"],
+        error=result["error"],
+    )
+    return result
+
+
+def run_batch(
+    directories: List[str],
+    output_dir: str,
+    pdf_config_path: Optional[str] = None,
+    excel_mappings_path: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    index_path: Optional[str] = REG_INDEX_PATH,
+    refresh: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Process every council file in the given directories on a process pool.
+
+    Outputs are written to output_dir/pdf/{council}.csv and
+    output_dir/excel/{council}.csv, and a run summary to output_dir/summary.json.
+    PDFs are streamed page by page, so the rows of a PDF output are only sorted
+    by reg within each page's records, unlike the app's downloads, which are
+    sorted as a whole.
+    The outputs of councils processed successfully replace their rows in the
+    registration index, and are recorded in output_dir/manifest.json with the
+    hashes of their source file and config.
+
+    Args:
+        directories (List[str]): Directories containing council files.
+        output_dir (str): Directory to write outputs and the summary to.
+        pdf_config_path (Optional[str]): Path to the PDF config CSV. Defaults
+            to the shared config uploaded on the PDF Config page.
+        excel_mappings_path (Optional[str]): Path to the Excel column mappings
+            CSV. Defaults to the shared mappings uploaded on the Excel Config
+            page.
+        max_workers (Optional[int]): Number of worker processes. Defaults to the
+            number of CPUs.
+        index_path (Optional[str]): Path of the registration index to update, or
+            None to leave it alone.
+        refresh (bool): Only process councils whose source file or config
+            changed since the manifest recorded them, or whose output is missing.
+
+    Returns:
+        List[Dict[str, Any]]: Summary of each council's run.
+    """
+    pdf_config = parse_pdf_config(load_config_text(pdf_config_path, "pdf_config.csv"))
+    df_mappings = pd.read_csv(
+        StringIO(load_config_text(excel_mappings_path, "excel_mappings.csv"))
+    )
+    manifest = load_manifest(output_dir)
+
+    results = []
+    jobs = []
+    hashes: Dict[str, Tuple[str, Optional[str]]] = {}
+    for source in find_sources(directories):
+        kind_dir = os.path.join(output_dir, source["kind"])
+        os.makedirs(kind_dir, exist_ok=True)
+        output_path = os.path.join(kind_dir, f"{source['council']}.csv")
+
+        if source["kind"] == "pdf":
+            if source["council"] not in pdf_config.councils:
+                error = pdf_config.errors.get(
+                    source["council"], "No PDF config for council"
+                )
+                results.append(
+                    {
+                        **source,
+                        "output": None,
+                        "rows": 0,
+                        "error": error,
+                        "duration_s": 0.0,
+                    }
+                )
+                continue
+            config = pdf_config.councils[source["council"]]
+        else:
+            config = df_mappings
+
+        key = entry_key(source["council"], source["kind"])
+        source_hash = hash_file(source["path"])
+        try:
+            current_config = config_hash(source, config)
+        except Exception:
+            # Processing the file will report the error
+            current_config = None
+        entry = manifest.get(key)
+        if (
+            refresh
+            and current_config is not None
+            and not is_stale(entry, source_hash, current_config)
+        ):
+            print(f"[{source['kind']}] {source['council']}: unchanged", flush=True)
+            results.append(
+                {
+                    **source,
+                    "output": entry.output,
+                    "rows": entry.rows,
+                    "error": None,
+                    "duration_s": 0.0,
+                    "skipped": True,
+                }
+            )
+            continue
+
+        hashes[key] = (source_hash, current_config)
+        jobs.append((source, output_path, config))
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=max_workers, initializer=configure_logging
+    ) as executor:
+        futures = [executor.submit(process_source, *job) for job in jobs]
+        for future in futures:
+            result = future.result()
+            status = result["error"] or f"{result['rows']} rows"
+            print(
+                f"[{result['kind']}] {result['council']}: {status} "
+                f"({result['duration_s']}s)",
+                flush=True,
+            )
+            results.append(result)
+
+            source_hash, current_config = hashes[
+                entry_key(result["council"], result["kind"])
+            ]
+            if result["error"] is None and current_config is not None:
+                manifest[entry_key(result["council"], result["kind"])] = make_entry(
+                    result,
+                    source_hash,
+                    current_config,
+                    result["output"],
+                    result["rows"],
+                )
+    save_manifest(output_dir, manifest)
+
+    if index_path is not None:
+        upsert_councils(
+            {
+                (result["council"], result["kind"]): index_rows(
+                    pd.read_csv(result["output"], dtype=str),
+                    result["council"],
+                    result["kind"],
+                    os.path.basename(result["path"]),
+                )
+                for result in results
+                if result["error"] is None and not result.get("skipped")
+            },
+            index_path,
+        )
+
+    summary = {
+        "directories": directories,
+        "duration_s": round(time.perf_counter() - start, 3),
+        "councils": len(results),
+        "rows": sum(result["rows"] for result in results),
+        "failures": sum(result["error"] is not None for result in results),
+        "skipped": sum(bool(result.get("skipped")) for result in results),
+        "results": results,
+    }
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, "summary.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command line entry point for batch processing.
+
+    Args:
+        argv (Optional[List[str]]): Command line arguments. Defaults to sys.argv.
+
+    Returns:
+        int: 0 if every council processed successfully, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(
+        description="Process every council PDF and Excel file in a set of directories."
+    )
+    parser.add_argument(
+        "directories",
+        nargs="*",
+        default=DEFAULT_DIRECTORIES,
+        help="Directories containing council files named after the council.",
+    )
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument(
+        "--pdf-config",
+        help="PDF config CSV. Defaults to the config uploaded in the app.",
+    )
+    parser.add_argument(
+        "--excel-mappings",
+        help="Excel column mappings CSV. Defaults to the mappings uploaded in "
+        "the app.",
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--index", default=REG_INDEX_PATH)
+    parser.add_argument(
+        "--no-index",
+        action="store_true",
+        help="Do not update the registration index with the outputs.",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Only reprocess councils whose source file or config changed.",
+    )
+    args = parser.parse_args(argv)
+    configure_logging()
+
+    results = run_batch(
+        args.directories,
+        args.output_dir,
+        args.pdf_config,
+        args.excel_mappings,
+        args.workers,
+        None if args.no_index else args.index,
+        args.refresh,
+    )
+    failures = [result for result in results if result["error"] is not None]
+    print(
+        f"Processed {len(results)} files: "
+        f"{sum(result['rows'] for result in results)} rows, "
+        f"{len(failures)} failures, "
+        f"{sum(bool(result.get('skipped')) for result in results)} unchanged"
+    )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,356 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import time
+import traceback
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import List, Dict, Any, Callable, Optional
+from batch import (
+    DEFAULT_DIRECTORIES,
+    DEFAULT_EXCEL_MAPPINGS,
+    DEFAULT_PDF_CONFIG,
+    find_sources,
+)
+from council_config import CouncilConfig, parse_pdf_config
+from excel_processor import read_mapped_columns
+from pdf_processor import (
+    assign_intervals_and_values,
+    extract_pdf_text,
+    record_stages,
+    transform_df,
+)
+
+DEFAULT_OUTPUT: str = "output/benchmark.json"
+
+# Relative slowdown or memory growth over the baseline reported as a regression
+DEFAULT_THRESHOLD: float = 0.2
+
+# Stages faster than this in both runs are too noisy to compare
+DEFAULT_MIN_SECONDS: float = 0.05
+
+
+def peak_rss_mb() -> float:
+    """
+    Get the peak resident set size of this process and its finished children.
+
+    Returns:
+        float: Peak RSS in megabytes.
+    """
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def run_stage(
+    stages: Dict[str, Dict[str, Any]], name: str, func: Callable, *args
+) -> Any:
+    """
+    Run one pipeline stage, keeping its fastest time over repeated runs.
+
+    The in-memory size of the stage output is recorded alongside its time.
+
+    Args:
+        stages (Dict[str, Dict[str, Any]]): Stage timings, updated in place.
+        name (str): Name of the stage.
+        func (Callable): Stage function.
+        *args: Arguments passed to func.
+
+    Returns:
+        Any: The stage output.
+    """
+    start = time.perf_counter()
+    output = func(*args)
+    seconds = time.perf_counter() - start
+
+    if name not in stages or seconds < stages[name]["seconds"]:
+        rows = len(output)
+        stages[name] = {
+            "seconds": round(seconds, 4),
+            "rows": rows,
+            "rows_per_s": round(rows / seconds, 1) if seconds > 0 else None,
+            "output_mb": round(output.memory_usage(deep=True).sum() / (1024 * 1024), 3),
+        }
+    return output
+
+
+def run_pdf_stages(
+    pdf_path: str, council: CouncilConfig, stages: Dict[str, Dict[str, Any]]
+) -> pd.DataFrame:
+    """
+    Run each stage of the PDF pipeline on a council PDF.
+
+    Words are extracted serially, so the extraction's memory is counted in this
+    process's peak RSS rather than in pool workers that are still running, and
+    its time does not include starting the pool.
+
+    Args:
+        pdf_path (str): Path to the PDF file.
+        council (CouncilConfig): The council's parsed config.
+        stages (Dict[str, Dict[str, Any]]): Stage timings, updated in place.
+
+    Returns:
+        pd.DataFrame: The final table.
+    """
+    df = run_stage(
+        stages,
+        "extract_pdf_text",
+        partial(
+            extract_pdf_text,
+            max_workers=1,
+            region=council.region,
+            backend=council.backend,
+        ),
+        pdf_path,
+    )
+    df = run_stage(
+        stages,
+        "assign_intervals_and_values",
+        assign_intervals_and_values,
+        df,
+        council.gridline_index,
+    )
+    for name, stage in record_stages(council):
+        df = run_stage(stages, name, stage, df)
+    return run_stage(
+        stages,
+        "transform_df",
+        transform_df,
+        df,
+        council.unique_identifier,
+        council.normalization,
+    )
+
+
+def benchmark_source(
+    source: Dict[str, str], config: Any, repeat: int = 1
+) -> Dict[str, Any]:
+    """
+    Benchmark the processing of one council file.
+
+    Meant to run in a fresh process, so that the peak RSS belongs to this file.
+
+    Args:
+        source (Dict[str, str]): Source entry from batch.find_sources.
+        config (Any): The council's CouncilConfig for PDF sources, or the Excel
+            column mappings DataFrame for Excel sources.
+        repeat (int): Number of runs. The fastest time of each stage is kept.
+
+    Returns:
+        Dict[str, Any]: Stage timings, total time, peak RSS, rows and error.
+    """
+    result: Dict[str, Any] = {**source, "stages": {}, "rows": 0}
+    start_rss = peak_rss_mb()
+    try:
+        for _ in range(repeat):
+            if source["kind"] == "pdf":
+                df = run_pdf_stages(source["path"], config, result["stages"])
+            else:
+                df = run_stage(
+                    result["stages"],
+                    "read_mapped_columns",
+                    read_mapped_columns,
+                    source["path"],
+                    config,
+                )
+        result["rows"] = len(df)
+        result["error"] = None
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        result["traceback"] = traceback.format_exc()
+
+    total = sum(stage["seconds"] for stage in result["stages"].values())
+    result["seconds"] = round(total, 4)
+    result["rows_per_s"] = round(result["rows"] / total, 1) if total > 0 else None
+    result["start_rss_mb"] = round(start_rss, 1)
+    result["peak_rss_mb"] = round(peak_rss_mb(), 1)
+    return result
+
+
+def run_benchmark(
+    directories: List[str],
+    pdf_config_path: str = DEFAULT_PDF_CONFIG,
+    excel_mappings_path: str = DEFAULT_EXCEL_MAPPINGS,
+    repeat: int = 1,
+    councils: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Benchmark every council file in the given directories using local configs.
+
+    Files are processed one at a time, each in a fresh process, so timings do
+    not compete for CPUs and peak RSS is measured per file.
+
+    Args:
+        directories (List[str]): Directories containing council files.
+        pdf_config_path (str): Path to the PDF config CSV.
+        excel_mappings_path (str): Path to the Excel column mappings CSV.
+        repeat (int): Number of runs per file. The fastest time of each stage is kept.
+        councils (Optional[List[str]]): Councils to benchmark. Defaults to all.
+
+    Returns:
+        Dict[str, Any]: Benchmark report with environment details and results.
+    """
+    with open(pdf_config_path, encoding="utf-8") as f:
+        pdf_config = parse_pdf_config(f.read())
+    df_mappings = pd.read_csv(excel_mappings_path)
+
+    jobs = []
+    for source in find_sources(directories):
+        if councils is not None and source["council"] not in councils:
+            continue
+        if source["kind"] == "pdf":
+            if source["council"] not in pdf_config.councils:
+                continue
+            jobs.append((source, pdf_config.councils[source["council"]]))
+        else:
+            jobs.append((source, df_mappings))
+
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for source, config in jobs:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            result = executor.submit(benchmark_source, source, config, repeat).result()
+        status = result["error"] or (
+            f"{result['rows']} rows in {result['seconds']}s, "
+            f"peak {result['peak_rss_mb']} MB"
+        )
+        print(f"[{result['kind']}] {result['council']}: {status}", flush=True)
+        results.append(result)
+
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "cpus": os.cpu_count(),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare_reports(
+    report: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+    min_seconds: float = DEFAULT_MIN_SECONDS,
+) -> List[str]:
+    """
+    Compare a benchmark report against a baseline report.
+
+    A stage regresses if it is more than threshold slower than the baseline,
+    ignoring stages under min_seconds in both reports. A file regresses if its
+    peak RSS grew by more than threshold, or if its row count changed.
+
+    Args:
+        report (Dict[str, Any]): Report from run_benchmark.
+        baseline (Dict[str, Any]): Earlier report to compare against.
+        threshold (float): Allowed relative increase, e.g. 0.2 for 20%.
+        min_seconds (float): Stage time under which changes are ignored.
+
+    Returns:
+        List[str]: Description of each regression found.
+    """
+    baseline_results = {
+        (result["kind"], result["council"]): result for result in baseline["results"]
+    }
+
+    regressions = []
+    for result in report["results"]:
+        name = f"[{result['kind']}] {result['council']}"
+        previous = baseline_results.get((result["kind"], result["council"]))
+        if previous is None or result["error"] or previous["error"]:
+            continue
+
+        if result["rows"] != previous["rows"]:
+            regressions.append(
+                f"{name}: rows changed from {previous['rows']} to {result['rows']}"
+            )
+
+        for stage, timing in result["stages"].items():
+            if stage not in previous["stages"]:
+                continue
+            before = previous["stages"][stage]["seconds"]
+            after = timing["seconds"]
+            if max(before, after) < min_seconds:
+                continue
+            if after > before * (1 + threshold):
+                regressions.append(f"{name}: {stage} {before:.3f}s -> {after:.3f}s")
+
+        if result["peak_rss_mb"] > previous["peak_rss_mb"] * (1 + threshold):
+            regressions.append(
+                f"{name}: peak RSS {previous['peak_rss_mb']} MB -> "
+                f"{result['peak_rss_mb']} MB"
+            )
+
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command line entry point for benchmarking.
+
+    Args:
+        argv (Optional[List[str]]): Command line arguments. Defaults to sys.argv.
+
+    Returns:
+        int: 1 if any file failed or regressed against the baseline, 0 otherwise.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark the PDF and Excel pipelines on every council file."
+    )
+    parser.add_argument(
+        "directories",
+        nargs="*",
+        default=DEFAULT_DIRECTORIES,
+        help="Directories containing council files named after the council.",
+    )
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--pdf-config", default=DEFAULT_PDF_CONFIG)
+    parser.add_argument("--excel-mappings", default=DEFAULT_EXCEL_MAPPINGS)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument(
+        "--council", action="append", help="Council to benchmark, repeatable."
+    )
+    parser.add_argument("--baseline", help="Earlier benchmark JSON to compare with.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--min-seconds", type=float, default=DEFAULT_MIN_SECONDS)
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(
+        args.directories,
+        args.pdf_config,
+        args.excel_mappings,
+        args.repeat,
+        args.council,
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+
+    failures = [result for result in report["results"] if result["error"]]
+    regressions = []
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_reports(
+            report, baseline, args.threshold, args.min_seconds
+        )
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        print(f"{len(regressions)} regressions against {args.baseline}")
+
+    return 1 if failures or regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
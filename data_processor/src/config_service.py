@@ -0,0 +1,264 @@
+import streamlit as st
+import pandas as pd
+import datetime
+import os
+import threading
+import time
+import requests
+from dataclasses import dataclass
+from io import StringIO
+from typing import Dict, Optional, Tuple
+from variables import (
+    AWS_PRESIGNED_URL,
+    CONFIG_CACHE_DIR,
+    CONFIG_REQUEST_TIMEOUT,
+    CONFIG_TTL_SECONDS,
+)
+
+# Copies of the config files bundled with the repo, used to seed the local cache
+SEED_CONFIG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+
+
+@dataclass
+class CachedConfig:
+    """
+    A config file held in the in-process cache.
+
+    Attributes:
+        text (str): Content of the config file.
+        etag (Optional[str]): ETag returned by the bucket, used to revalidate.
+        fetched_at (float): time.monotonic() when the content was last validated.
+    """
+
+    text: str
+    etag: Optional[str]
+    fetched_at: float
+
+
+_cache: Dict[Tuple[str, str], CachedConfig] = {}
+_lock = threading.Lock()
+
+
+def local_config_path(file_name: str, cache_dir: str = CONFIG_CACHE_DIR) -> str:
+    """
+    Get the path of the local copy of a config file.
+
+    Args:
+        file_name (str): Name of the config file.
+        cache_dir (str): Directory holding local copies.
+
+    Returns:
+        str: Path of the local copy.
+    """
+    return os.path.join(cache_dir, file_name)
+
+
+def save_local_copy(
+    file_name: str, text: str, cache_dir: str = CONFIG_CACHE_DIR
+) -> None:
+    """
+    Save a local copy of a config file, replacing any previous copy atomically.
+
+    Args:
+        file_name (str): Name of the config file.
+        text (str): Content of the config file.
+        cache_dir (str): Directory holding local copies.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    path = local_config_path(file_name, cache_dir)
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(temp_path, path)
+
+
+def load_local_copy(file_name: str, cache_dir: str = CONFIG_CACHE_DIR) -> str:
+    """
+    Load the local copy of a config file, seeding it from the repo if needed.
+
+    Args:
+        file_name (str): Name of the config file.
+        cache_dir (str): Directory holding local copies.
+
+    Returns:
+        str: Content of the config file.
+    """
+    path = local_config_path(file_name, cache_dir)
+    if not os.path.exists(path):
+        with open(os.path.join(SEED_CONFIG_DIR, file_name), encoding="utf-8") as f:
+            save_local_copy(file_name, f.read(), cache_dir)
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def get_config_text(
+    file_name: str,
+    base_url: str = AWS_PRESIGNED_URL,
+    ttl: float = CONFIG_TTL_SECONDS,
+    cache_dir: str = CONFIG_CACHE_DIR,
+) -> str:
+    """
+    Get a config file from the S3 bucket, served from cache where possible.
+
+    Content younger than ttl seconds is returned without a request. Older
+    content is revalidated with If-None-Match, so an unchanged file costs a
+    304 response rather than a download. If the bucket cannot be reached, the
+    last known content is used, falling back to the local on-disk copy.
+
+    Args:
+        file_name (str): Name of the file to download.
+        base_url (str): URL of the bucket.
+        ttl (float): Seconds for which cached content is used without revalidating.
+        cache_dir (str): Directory holding local copies.
+
+    Returns:
+        str: Content of the config file.
+    """
+    key = (base_url, file_name)
+    with _lock:
+        cached = _cache.get(key)
+    if cached is not None and time.monotonic() - cached.fetched_at < ttl:
+        return cached.text
+
+    headers = {}
+    if cached is not None and cached.etag is not None:
+        headers["If-None-Match"] = cached.etag
+
+    # The request runs without the lock, so a slow bucket does not block
+    # readers of other files
+    try:
+        response = requests.get(
+            f"{base_url}/{file_name}",
+            headers=headers,
+            timeout=CONFIG_REQUEST_TIMEOUT,
+        )
+        if response.status_code == 304 and cached is not None:
+            text, etag = cached.text, cached.etag
+        else:
+            response.raise_for_status()
+            text = response.content.decode("utf-8")
+            etag = response.headers.get("ETag")
+            save_local_copy(file_name, text, cache_dir)
+    except requests.RequestException:
+        if cached is not None:
+            text, etag = cached.text, cached.etag
+        else:
+            text, etag = load_local_copy(file_name, cache_dir), None
+
+    with _lock:
+        _cache[key] = CachedConfig(text=text, etag=etag, fetched_at=time.monotonic())
+    return text
+
+
+def read_config(
+    file_name: str, index_col: Optional[int] = None, **kwargs
+) -> pd.DataFrame:
+    """
+    Get a config file as a DataFrame.
+
+    Args:
+        file_name (str): Name of the file to download.
+        index_col (Optional[int]): Column to use as the index, if any.
+        **kwargs: Passed on to get_config_text.
+
+    Returns:
+        pd.DataFrame: DataFrame containing the configuration data.
+    """
+    return pd.read_csv(
+        StringIO(get_config_text(file_name, **kwargs)), index_col=index_col
+    )
+
+
+def invalidate_config(
+    file_name: Optional[str] = None, base_url: Optional[str] = None
+) -> None:
+    """
+    Drop config files from the in-process cache so the next read downloads them.
+
+    Args:
+        file_name (Optional[str]): File to drop. Defaults to all files.
+        base_url (Optional[str]): Bucket to drop files for. Defaults to all buckets.
+    """
+    with _lock:
+        for key in list(_cache):
+            if (base_url is None or key[0] == base_url) and (
+                file_name is None or key[1] == file_name
+            ):
+                del _cache[key]
+
+
+def put_config(
+    file_name: str,
+    data: bytes,
+    base_url: str = AWS_PRESIGNED_URL,
+    cache_dir: str = CONFIG_CACHE_DIR,
+) -> requests.Response:
+    """
+    Upload a config file to the S3 bucket and invalidate the cached copy.
+
+    Args:
+        file_name (str): Name of the file to upload.
+        data (bytes): Content of the file.
+        base_url (str): URL of the bucket.
+        cache_dir (str): Directory holding local copies.
+
+    Returns:
+        requests.Response: Response to the upload request.
+    """
+    response = requests.put(
+        f"{base_url}/{file_name}", data=data, timeout=CONFIG_REQUEST_TIMEOUT
+    )
+    if response.status_code == 200:
+        invalidate_config(file_name, base_url)
+        save_local_copy(file_name, data.decode("utf-8"), cache_dir)
+    return response
+
+
+def download_config(file_name: str, label: str, mime: str) -> str:
+    """
+    Get a configuration file and create a download button for it.
+
+    Args:
+        file_name (str): Name of the file to download.
+        label (str): Label for the download button.
+        mime (str): MIME type of the file.
+
+    Returns:
+        str: Content of the downloaded file.
+    """
+    data = get_config_text(file_name)
+
+    timestamp = datetime.datetime.now().strftime("%d_%m_%YT%H_%M_%S")
+    file_name_with_timestamp = f"{file_name.split('.')[0]}_{timestamp}.csv"
+    st.download_button(
+        label=label,
+        data=data,
+        file_name=file_name_with_timestamp,
+        mime=mime,
+    )
+
+    return data
+
+
+def upload_config(file_name: str, uploaded_file) -> None:
+    """
+    Upload configuration file to S3 bucket.
+
+    Each uploaded file is sent once. The file stays in the uploader across
+    reruns of the page, which show the result of its upload without sending
+    it again.
+
+    Args:
+        file_name (str): Name of the config file to replace.
+        uploaded_file: File uploaded by the user.
+    """
+    if uploaded_file is not None:
+        key = f"uploaded_{file_name}"
+        if st.session_state.get(key, (None,))[0] != uploaded_file.file_id:
+            response = put_config(file_name, uploaded_file.getvalue())
+            st.session_state[key] = (uploaded_file.file_id, response.status_code)
+        status_code = st.session_state[key][1]
+        if status_code == 200:
+            st.success("File uploaded successfully.")
+        else:
+            st.error(f"Failed to upload file. Status code: {status_code}")
@@ -0,0 +1,151 @@
+import sys
+import glob
+import os
+import time
+import pandas as pd
+from collections import Counter
+from typing import Any, Dict, Hashable, Iterable
+from council_config import CouncilConfig, parse_pdf_config
+from equivalence import frames_match, process_words
+from pdf_processor import assign_intervals_and_values, extract_pdf_text
+from variables import DEFAULT_PDF_BACKEND, PDF_BACKENDS
+
+
+def agreement(items: Iterable[Hashable], other: Iterable[Hashable]) -> float:
+    """
+    Measure how much two collections agree, counting repeated items.
+
+    Args:
+        items (Iterable[Hashable]): First collection.
+        other (Iterable[Hashable]): Second collection.
+
+    Returns:
+        float: Items in both collections as a fraction of the larger one, or
+            1.0 if both are empty.
+    """
+    items, other = Counter(items), Counter(other)
+    total = max(sum(items.values()), sum(other.values()))
+    if total == 0:
+        return 1.0
+    return sum((items & other).values()) / total
+
+
+def assigned_words(df: pd.DataFrame, council: CouncilConfig) -> Iterable[Hashable]:
+    """
+    Get the words of a council PDF that fall within its gridlines.
+
+    Args:
+        df (pd.DataFrame): Extracted words.
+        council (CouncilConfig): The council's parsed config.
+
+    Returns:
+        Iterable[Hashable]: (page, label, text) of each word within a gridline.
+    """
+    df = assign_intervals_and_values(df.copy(), council.gridline_index)
+    df = df[df["value"].notna()]
+    return zip(df["page"], df["value"].astype(str), df["text"])
+
+
+def record_rows(df: pd.DataFrame) -> Iterable[Hashable]:
+    """
+    Get the rows of a final table as comparable tuples.
+
+    Args:
+        df (pd.DataFrame): Final table.
+
+    Returns:
+        Iterable[Hashable]: One tuple per row, with missing values as None.
+    """
+    df = df.astype(object).where(df.notna(), None)
+    return df.itertuples(index=False, name=None)
+
+
+def check_backends(pdf_path: str, council: CouncilConfig) -> Dict[str, Any]:
+    """
+    Compare every extraction backend with the default one on a council PDF.
+
+    Args:
+        pdf_path (str): Path to the council PDF.
+        council (CouncilConfig): The council's parsed config.
+
+    Returns:
+        Dict[str, Any]: Extraction seconds of each backend, and for each other
+            backend the fraction of gridline words and final rows that agree
+            with the default backend, and whether the final tables are
+            identical.
+    """
+    words = {}
+    seconds = {}
+    for backend in PDF_BACKENDS:
+        start = time.perf_counter()
+        words[backend] = extract_pdf_text(
+            pdf_path, region=council.region, backend=backend
+        )
+        seconds[backend] = round(time.perf_counter() - start, 3)
+
+    expected_words = list(assigned_words(words[DEFAULT_PDF_BACKEND], council))
+    expected = process_words(words[DEFAULT_PDF_BACKEND], council)
+    result: Dict[str, Any] = {"seconds": seconds, "backends": {}}
+    for backend in PDF_BACKENDS:
+        if backend == DEFAULT_PDF_BACKEND:
+            continue
+        final = process_words(words[backend], council)
+        result["backends"][backend] = {
+            "word_agreement": agreement(
+                assigned_words(words[backend], council), expected_words
+            ),
+            "record_agreement": agreement(record_rows(final), record_rows(expected)),
+            "identical": frames_match(final, expected),
+        }
+    return result
+
+
+def main(
+    pdf_dir: str = "pdf_files/tabular",
+    config_path: str = "data_processor/data/pdf_config.csv",
+) -> int:
+    """
+    Report how well each extraction backend agrees with the default backend
+    on every council PDF in a directory.
+
+    Args:
+        pdf_dir (str): Directory containing council PDFs named after the council.
+        config_path (str): Path to the PDF config CSV.
+
+    Returns:
+        int: 1 if a council configured with another backend does not get the
+            same final table as with the default backend, 0 otherwise.
+    """
+    with open(config_path, encoding="utf-8") as f:
+        pdf_config = parse_pdf_config(f.read())
+    failures = 0
+    identical = Counter()
+    checked = 0
+
+    for pdf_path in sorted(glob.glob(os.path.join(pdf_dir, "*.pdf"))):
+        name = os.path.splitext(os.path.basename(pdf_path))[0]
+        if name not in pdf_config.councils:
+            continue
+        council = pdf_config.councils[name]
+        result = check_backends(pdf_path, council)
+        checked += 1
+        for backend, comparison in result["backends"].items():
+            identical[backend] += comparison["identical"]
+            configured = " (configured)" if backend == council.backend else ""
+            print(
+                f"{name}: {backend}{configured} "
+                f"{result['seconds'][backend]}s vs "
+                f"{result['seconds'][DEFAULT_PDF_BACKEND]}s, "
+                f"words {comparison['word_agreement']:.1%}, "
+                f"records {comparison['record_agreement']:.1%}, "
+                f"{'identical' if comparison['identical'] else 'DIFFERENT'}"
+            )
+            failures += bool(configured) and not comparison["identical"]
+
+    for backend, count in identical.items():
+        print(f"{backend}: identical for {count} of {checked} councils")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(*sys.argv[1:]))
@@ -0,0 +1,540 @@
+import ast
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from io import StringIO
+from typing import List, Dict, Any, Optional, Tuple
+from config_service import get_config_text
+from normalization import NormalizationRules, compile_rules
+from variables import (
+    DEFAULT_PDF_BACKEND,
+    DEFAULT_ROW_MODE,
+    PDF_BACKENDS,
+    ROW_MODES,
+)
+
+# Number of distinct config file contents kept parsed in memory
+PARSED_CONFIG_CACHE_SIZE = 4
+
+# Optional pdf_config.csv columns restricting the part of the PDF extracted
+REGION_COLUMNS = [
+    "first_page",
+    "last_page",
+    "top_margin",
+    "bottom_margin",
+    "crop_to_gridlines",
+]
+
+
+@dataclass(frozen=True)
+class GridlineIndex:
+    """
+    Gridlines compiled into sorted boundary arrays for vectorized lookups.
+
+    Attributes:
+        boundaries (np.ndarray): Sorted, unique interval edges, as float32 like
+            the word coordinates they are compared with.
+        segment_interval (np.ndarray): Position in intervals of the interval that
+            owns each segment between consecutive boundaries, or -1 for a gap.
+        intervals (List[Any]): Gridline intervals in sorted order.
+        label_codes (np.ndarray): Position in labels of each interval's label.
+        labels (List[str]): Unique labels in gridline order.
+    """
+
+    boundaries: np.ndarray
+    segment_interval: np.ndarray
+    intervals: List[Any]
+    label_codes: np.ndarray
+    labels: List[str]
+
+
+def compile_gridlines(gridlines: List[Dict[str, Any]]) -> GridlineIndex:
+    """
+    Compile gridlines into a GridlineIndex.
+
+    A number belongs to the first interval, in sorted order, that satisfies
+    start <= number < end, and to no interval if it falls in a gap.
+
+    Words are stored with float32 coordinates, so the boundaries are rounded
+    to float32 too, and a word starting exactly on a gridline stays in the
+    interval it starts. Words within float32 precision (about 0.00003 points
+    on a typical page) of a gridline can still fall on either side of it, as
+    their coordinates were rounded before being compared.
+
+    Args:
+        gridlines (List[Dict[str, Any]]): List of gridline dictionaries.
+
+    Returns:
+        GridlineIndex: The compiled gridlines.
+    """
+    intervals = sorted(item["interval"] for item in gridlines)
+    labels = list(dict.fromkeys(item["label"] for item in gridlines))
+    # Each interval takes the label of the first gridline that defines it
+    label_codes = np.array(
+        [
+            labels.index(
+                next(
+                    item["label"] for item in gridlines if item["interval"] == interval
+                )
+            )
+            for interval in intervals
+        ],
+        dtype=np.int64,
+    )
+
+    bounds = np.array(intervals, dtype=np.float32).reshape(-1, 2)
+    boundaries = np.unique(bounds)
+    segment_interval = np.full(max(len(boundaries) - 1, 0), -1, dtype=np.int64)
+    for segment, start in enumerate(boundaries[:-1]):
+        for position, (interval_start, interval_end) in enumerate(bounds):
+            if interval_start <= start < interval_end:
+                segment_interval[segment] = position
+                break
+
+    return GridlineIndex(
+        boundaries=boundaries,
+        segment_interval=segment_interval,
+        intervals=intervals,
+        label_codes=label_codes,
+        labels=labels,
+    )
+
+
+# Bounding box (x0, top, x1, bottom) in PDF points
+BBox = Tuple[float, float, float, float]
+
+
+@dataclass(frozen=True)
+class ExtractionRegion:
+    """
+    The part of a council's PDF that words are extracted from.
+
+    Attributes:
+        first_page (Optional[int]): First page to extract (1-based), or None to
+            start at the first page.
+        last_page (Optional[int]): Last page to extract (1-based, inclusive), or
+            None to end at the last page.
+        top_margin (float): Height skipped at the top of each page, in points.
+        bottom_margin (float): Height skipped at the bottom of each page.
+        x0 (Optional[float]): Leftmost x0 of the kept words, or None for the
+            page edge.
+        x1 (Optional[float]): Right edge of the kept words' x0, exclusive, or
+            None for the page edge.
+    """
+
+    first_page: Optional[int] = None
+    last_page: Optional[int] = None
+    top_margin: float = 0.0
+    bottom_margin: float = 0.0
+    x0: Optional[float] = None
+    x1: Optional[float] = None
+
+    @property
+    def is_full(self) -> bool:
+        """
+        bool: True if the region covers every page in full.
+        """
+        return self == FULL_REGION
+
+    def page_range(self, num_pages: int) -> Tuple[int, int]:
+        """
+        Get the pages of a document inside the region.
+
+        Args:
+            num_pages (int): Number of pages in the document.
+
+        Returns:
+            Tuple[int, int]: (start, stop) 1-based page range, empty if the
+                document ends before the first page.
+        """
+        start = self.first_page or 1
+        stop = num_pages + 1 if self.last_page is None else self.last_page + 1
+        stop = min(stop, num_pages + 1)
+        return start, max(start, stop)
+
+    def crop_bbox(self, page_bbox: BBox) -> Optional[BBox]:
+        """
+        Get the band of a page between its top and bottom margins.
+
+        Only the margins are cropped before extraction, as cropping across a
+        line cuts the words crossing it; the horizontal span is applied to the
+        extracted words by in_span.
+
+        Args:
+            page_bbox (BBox): Bounding box of the page.
+
+        Returns:
+            Optional[BBox]: The kept band, equal to page_bbox when nothing is
+                cropped, or None if nothing of the page is kept.
+        """
+        x0, top, x1, bottom = page_bbox
+        top += self.top_margin
+        bottom -= self.bottom_margin
+        if top >= bottom:
+            return None
+        return x0, top, x1, bottom
+
+    def in_span(self, x0: float) -> bool:
+        """
+        Check whether a word starting at x0 lies in the region's horizontal
+        span, which like a gridline interval includes its start but not its end.
+
+        Args:
+            x0 (float): Left edge of the word.
+
+        Returns:
+            bool: True if the word is kept.
+        """
+        return (self.x0 is None or x0 >= self.x0) and (self.x1 is None or x0 < self.x1)
+
+
+FULL_REGION = ExtractionRegion()
+
+
+@dataclass(frozen=True)
+class CouncilConfig:
+    """
+    A council's PDF config, parsed and validated once.
+
+    Attributes:
+        name (str): Name of the council.
+        gridlines (List[Dict[str, Any]]): List of gridline dictionaries.
+        gridline_index (GridlineIndex): The gridlines compiled for lookups.
+        unique_identifier (str): Label of the column that starts each record.
+        labels (List[str]): Unique gridline labels in gridline order.
+        date_format (Optional[str]): Date format string, if dates are parsed.
+        config_hash (str): SHA-256 of the council's raw gridlines, date format
+            and extraction region.
+        region (ExtractionRegion): The part of the PDF words are extracted from.
+        backend (str): Name of the word extraction backend, one of PDF_BACKENDS.
+        normalization (NormalizationRules): Rules for cleaning and validating
+            the council's records, compiled from its date formats and text case.
+        row_mode (str): How words are split into records, one of ROW_MODES.
+    """
+
+    name: str
+    gridlines: List[Dict[str, Any]]
+    gridline_index: GridlineIndex = field(repr=False)
+    unique_identifier: str
+    labels: List[str]
+    date_format: Optional[str]
+    config_hash: str
+    region: ExtractionRegion = FULL_REGION
+    backend: str = DEFAULT_PDF_BACKEND
+    normalization: NormalizationRules = field(
+        default_factory=lambda: compile_rules(None), repr=False
+    )
+    row_mode: str = DEFAULT_ROW_MODE
+
+
+@dataclass(frozen=True)
+class PdfConfig:
+    """
+    All councils parsed from a PDF config file.
+
+    Attributes:
+        councils (Dict[str, CouncilConfig]): Valid council configs by name.
+        errors (Dict[str, str]): Reason each invalid council was skipped.
+        content_hash (str): SHA-256 of the config file content.
+    """
+
+    councils: Dict[str, CouncilConfig]
+    errors: Dict[str, str]
+    content_hash: str
+
+
+_parsed: "OrderedDict[str, PdfConfig]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def parse_gridlines(text: str) -> List[Dict[str, Any]]:
+    """
+    Parse and validate the gridlines of a council from their config text.
+
+    Args:
+        text (str): Python literal for a list of {'interval': [start, end],
+            'label': label} dictionaries.
+
+    Returns:
+        List[Dict[str, Any]]: List of gridline dictionaries.
+
+    Raises:
+        ValueError: If the text is not a valid list of gridlines.
+    """
+    try:
+        gridlines = ast.literal_eval(text)
+    except (ValueError, SyntaxError) as e:
+        raise ValueError(f"gridlines are not a valid literal: {e}") from e
+
+    if not isinstance(gridlines, list) or not gridlines:
+        raise ValueError("gridlines must be a non-empty list")
+    for item in gridlines:
+        if not isinstance(item, dict) or set(item) != {"interval", "label"}:
+            raise ValueError(f"gridline must have an interval and a label: {item}")
+        interval = item["interval"]
+        if (
+            not isinstance(interval, list)
+            or len(interval) != 2
+            or not all(isinstance(bound, (int, float)) for bound in interval)
+        ):
+            raise ValueError(f"interval must be a [start, end] pair: {interval}")
+        if interval[0] >= interval[1]:
+            raise ValueError(f"interval must start before it ends: {interval}")
+        if not isinstance(item["label"], str) or not item["label"]:
+            raise ValueError(f"label must be a non-empty string: {item['label']}")
+    return gridlines
+
+
+def is_blank(value: Optional[str]) -> bool:
+    """
+    Check whether an optional config value was left empty.
+
+    Args:
+        value (Optional[str]): Config value, or None/NaN if the column is
+            missing or empty.
+
+    Returns:
+        bool: True if no value was given.
+    """
+    return value is None or pd.isna(value) or not str(value).strip()
+
+
+def parse_number(value: Optional[str], name: str, integer: bool = False) -> Any:
+    """
+    Parse an optional non-negative number from a config value.
+
+    Args:
+        value (Optional[str]): Config value, or None/NaN if not given.
+        name (str): Name of the config column, for error messages.
+        integer (bool): Whether the number must be a positive whole number.
+
+    Returns:
+        Any: The number, or None if not given.
+
+    Raises:
+        ValueError: If the value is not a valid number.
+    """
+    if is_blank(value):
+        return None
+    try:
+        number = float(value)
+    except ValueError as e:
+        raise ValueError(f"{name} must be a number: {value}") from e
+    if integer:
+        if not number.is_integer() or number < 1:
+            raise ValueError(f"{name} must be a page number: {value}")
+        return int(number)
+    if number < 0:
+        raise ValueError(f"{name} must not be negative: {value}")
+    return number
+
+
+def parse_region(
+    gridline_index: GridlineIndex,
+    first_page: Optional[str] = None,
+    last_page: Optional[str] = None,
+    top_margin: Optional[str] = None,
+    bottom_margin: Optional[str] = None,
+    crop_to_gridlines: Optional[str] = None,
+) -> ExtractionRegion:
+    """
+    Parse a council's extraction region from its optional config values.
+
+    Args:
+        gridline_index (GridlineIndex): The council's compiled gridlines.
+        first_page (Optional[str]): First page to extract.
+        last_page (Optional[str]): Last page to extract.
+        top_margin (Optional[str]): Height to skip at the top of each page.
+        bottom_margin (Optional[str]): Height to skip at the bottom of each page.
+        crop_to_gridlines (Optional[str]): "true" to only keep words starting
+            within the horizontal span of the gridlines.
+
+    Returns:
+        ExtractionRegion: The parsed region.
+
+    Raises:
+        ValueError: If a value is invalid.
+    """
+    region = ExtractionRegion(
+        first_page=parse_number(first_page, "first_page", integer=True),
+        last_page=parse_number(last_page, "last_page", integer=True),
+        top_margin=parse_number(top_margin, "top_margin") or 0.0,
+        bottom_margin=parse_number(bottom_margin, "bottom_margin") or 0.0,
+    )
+    if (
+        region.first_page is not None
+        and region.last_page is not None
+        and region.first_page > region.last_page
+    ):
+        raise ValueError("first_page must not be after last_page")
+
+    if not is_blank(crop_to_gridlines):
+        crop = str(crop_to_gridlines).strip().lower()
+        if crop not in ("true", "false"):
+            raise ValueError(
+                f"crop_to_gridlines must be true or false: {crop_to_gridlines}"
+            )
+        if crop == "true":
+            region = replace(
+                region,
+                x0=float(min(interval[0] for interval in gridline_index.intervals)),
+                x1=float(max(interval[1] for interval in gridline_index.intervals)),
+            )
+    return region
+
+
+def parse_council_config(
+    name: str,
+    gridlines_text: str,
+    date_format: Optional[str],
+    backend: Optional[str] = None,
+    text_case: Optional[str] = None,
+    row_mode: Optional[str] = None,
+    **region_fields: Optional[str],
+) -> CouncilConfig:
+    """
+    Parse and compile one council's config.
+
+    Args:
+        name (str): Name of the council.
+        gridlines_text (str): The council's gridlines config text.
+        date_format (Optional[str]): The council's date format, or None/NaN.
+        backend (Optional[str]): The council's extraction backend, or None/NaN
+            for DEFAULT_PDF_BACKEND.
+        text_case (Optional[str]): Case conversion for make and model, one of
+            TEXT_CASES, or None/NaN to keep the case as written.
+        row_mode (Optional[str]): How words are split into records, one of
+            ROW_MODES, or None/NaN for DEFAULT_ROW_MODE.
+        **region_fields (Optional[str]): The council's optional extraction
+            region values, passed on to parse_region.
+
+    Returns:
+        CouncilConfig: The parsed config.
+
+    Raises:
+        ValueError: If the config is invalid.
+    """
+    if date_format is not None and pd.isna(date_format):
+        date_format = None
+
+    gridlines = parse_gridlines(gridlines_text)
+    gridline_index = compile_gridlines(gridlines)
+    region = parse_region(gridline_index, **region_fields)
+
+    backend = DEFAULT_PDF_BACKEND if is_blank(backend) else str(backend).strip()
+    if backend not in PDF_BACKENDS:
+        raise ValueError(f"backend must be one of {', '.join(PDF_BACKENDS)}: {backend}")
+
+    text_case = None if is_blank(text_case) else str(text_case).strip().lower()
+    normalization = compile_rules(date_format, text_case)
+
+    row_mode = DEFAULT_ROW_MODE if is_blank(row_mode) else str(row_mode).strip()
+    if row_mode not in ROW_MODES:
+        raise ValueError(f"row_mode must be one of {', '.join(ROW_MODES)}: {row_mode}")
+
+    config_text = f"{gridlines_text}\n{date_format or ''}"
+    # Councils extracting whole pages with the default backend keep the hash
+    # they had before regions, backends, text case and row modes could be
+    # configured
+    if not region.is_full:
+        config_text += f"\n{region}"
+    if backend != DEFAULT_PDF_BACKEND:
+        config_text += f"\nbackend={backend}"
+    if text_case is not None:
+        config_text += f"\ntext_case={text_case}"
+    if row_mode != DEFAULT_ROW_MODE:
+        config_text += f"\nrow_mode={row_mode}"
+    config_hash = hashlib.sha256(config_text.encode("utf-8")).hexdigest()
+
+    return CouncilConfig(
+        name=name,
+        gridlines=gridlines,
+        gridline_index=gridline_index,
+        unique_identifier=gridlines[0]["label"],
+        labels=gridline_index.labels,
+        date_format=date_format,
+        config_hash=config_hash,
+        region=region,
+        backend=backend,
+        normalization=normalization,
+        row_mode=row_mode,
+    )
+
+
+def parse_pdf_config(text: str) -> PdfConfig:
+    """
+    Parse every council in a PDF config file, memoized by content hash.
+
+    Args:
+        text (str): Content of pdf_config.csv.
+
+    Returns:
+        PdfConfig: The parsed councils and any errors.
+    """
+    content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    with _lock:
+        if content_hash in _parsed:
+            _parsed.move_to_end(content_hash)
+            return _parsed[content_hash]
+
+    df = pd.read_csv(StringIO(text), index_col=0, dtype=str)
+    councils: Dict[str, CouncilConfig] = {}
+    errors: Dict[str, str] = {}
+    for name, row in df.iterrows():
+        try:
+            councils[name] = parse_council_config(
+                name,
+                row["gridlines"],
+                row.get("date_format"),
+                row.get("backend"),
+                row.get("text_case"),
+                row.get("row_mode"),
+                **{col: row.get(col) for col in REGION_COLUMNS},
+            )
+        except ValueError as e:
+            errors[name] = str(e)
+
+    pdf_config = PdfConfig(councils=councils, errors=errors, content_hash=content_hash)
+    with _lock:
+        _parsed[content_hash] = pdf_config
+        while len(_parsed) > PARSED_CONFIG_CACHE_SIZE:
+            _parsed.popitem(last=False)
+    return pdf_config
+
+
+def load_pdf_config(file_name: str = "pdf_config.csv", **kwargs) -> PdfConfig:
+    """
+    Get the PDF config file and parse it.
+
+    Args:
+        file_name (str): Name of the file to download.
+        **kwargs: Passed on to get_config_text.
+
+    Returns:
+        PdfConfig: The parsed councils and any errors.
+    """
+    return parse_pdf_config(get_config_text(file_name, **kwargs))
+
+
+def changed_councils(old: PdfConfig, new: PdfConfig) -> List[str]:
+    """
+    Find the councils whose config differs between two PDF configs.
+
+    Args:
+        old (PdfConfig): The config before a change.
+        new (PdfConfig): The config after the change.
+
+    Returns:
+        List[str]: Sorted names of the councils added, removed or changed.
+    """
+    names = set(old.councils) | set(new.councils)
+    return sorted(
+        name
+        for name in names
+        if name not in old.councils
+        or name not in new.councils
+        or old.councils[name].config_hash != new.councils[name].config_hash
+    )
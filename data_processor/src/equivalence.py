@@ -0,0 +1,339 @@
+import sys
+import glob
+import os
+import numpy as np
+import pandas as pd
+from dataclasses import replace
+from typing import List, Dict
+from council_config import CouncilConfig, ExtractionRegion, parse_pdf_config
+from extractors import open_pdf
+from pdf_processor import (
+    extract_pdf_text,
+    assign_intervals_and_values,
+    process_consecutive_values,
+    assemble_records,
+    assemble_line_records,
+    record_stages,
+    sort_line_bands,
+    transform_df,
+)
+from variables import DEFAULT_PDF_BACKEND, LINE_BAND_TOLERANCE
+
+
+def process_consecutive_values_reference(
+    df: pd.DataFrame, target_value: str
+) -> pd.DataFrame:
+    """
+    Row-by-row reference implementation of process_consecutive_values.
+
+    Args:
+        df (pd.DataFrame): Input DataFrame.
+        target_value (str): Target value to process.
+
+    Returns:
+        pd.DataFrame: Processed DataFrame.
+    """
+    processed_rows = []
+    current_row = None
+
+    for _, row in df.iterrows():
+        if row["value"] == target_value:
+            if current_row is None:
+                current_row = row.copy()
+            else:
+                # Concatenate the text field
+                current_row["text"] += " " + row["text"]
+                # Update the bounding box
+                current_row["x1"] = max(current_row["x1"], row["x1"])
+                current_row["y1"] = max(current_row["y1"], row["y1"])
+        else:
+            if current_row is not None:
+                processed_rows.append(current_row)
+                current_row = None
+            processed_rows.append(row)
+
+    if current_row is not None:
+        processed_rows.append(current_row)
+
+    return pd.DataFrame(processed_rows)
+
+
+def split_dataframe_reference(
+    df_reduced: pd.DataFrame, unique_identifier: str
+) -> List[pd.DataFrame]:
+    """
+    Reference implementation splitting DataFrame into chunks per record.
+
+    Args:
+        df_reduced (pd.DataFrame): Input DataFrame.
+        unique_identifier (str): Unique identifier to split on.
+
+    Returns:
+        List[pd.DataFrame]: List of split DataFrames.
+    """
+    # Initialize an empty list to store the dataframes
+    dataframes_list = []
+
+    # Find the indices where "reference_number" appears in the value column
+    reference_indices = df_reduced[df_reduced["value"] == unique_identifier].index
+
+    # Iterate through the indices and create dataframes
+    for i in range(len(reference_indices)):
+        start_idx = reference_indices[i]
+        end_idx = (
+            reference_indices[i + 1]
+            if i + 1 < len(reference_indices)
+            else len(df_reduced)
+        )
+        chunk_df = df_reduced[start_idx:end_idx].reset_index(drop=True)
+        dataframes_list.append(chunk_df)
+
+    return dataframes_list
+
+
+def process_dataframes_reference(
+    dataframes_list: List[pd.DataFrame], unique_identifier: str
+) -> pd.DataFrame:
+    """
+    Reference implementation processing the chunks into a single DataFrame.
+
+    Args:
+        dataframes_list (List[pd.DataFrame]): List of DataFrames to process.
+        unique_identifier (str): Unique identifier column.
+
+    Returns:
+        pd.DataFrame: Processed DataFrame.
+    """
+    new_dataframes_list = []
+
+    for df in dataframes_list:
+        df = df.groupby("value", as_index=False, observed=True).agg({"text": " ".join})
+        df[unique_identifier] = df[df["value"] == unique_identifier]["text"].iloc[0]
+        df = df.pivot_table(
+            index=unique_identifier, columns="value", values="text", aggfunc="first"
+        )
+        df.reset_index(inplace=True, drop=True)
+        new_dataframes_list.append(df)
+
+    new_df = pd.concat(new_dataframes_list)
+    return new_df
+
+
+def line_records_reference(
+    df: pd.DataFrame, unique_identifier: str, tolerance: float = LINE_BAND_TOLERANCE
+) -> pd.DataFrame:
+    """
+    Row-by-row reference implementation of sort_line_bands followed by
+    assemble_line_records.
+
+    Args:
+        df (pd.DataFrame): Words with assigned values.
+        unique_identifier (str): Label of the column that starts each record.
+        tolerance (float): Largest gap in points between the tops of words on
+            the same band.
+
+    Returns:
+        pd.DataFrame: One row per record, with columns in no particular order.
+    """
+    bands = []
+    previous = None
+    for _, row in df.sort_values(["page", "y0"], kind="stable").iterrows():
+        if (
+            previous is None
+            or row["page"] != previous["page"]
+            or row["y0"] - previous["y0"] > tolerance
+        ):
+            bands.append([])
+        bands[-1].append(row)
+        previous = row
+
+    records = []
+    for band in bands:
+        band = sorted(band, key=lambda row: row["x0"])
+        if any(row["value"] == unique_identifier for row in band):
+            records.append({})
+        if not records:
+            continue
+        for row in band:
+            if pd.notna(row["value"]):
+                records[-1].setdefault(row["value"], []).append(row["text"])
+
+    rows = [
+        {label: " ".join(text) for label, text in record.items()} for record in records
+    ]
+    return pd.DataFrame(rows, index=np.zeros(len(rows), dtype=np.int64))
+
+
+def frames_match(df: pd.DataFrame, expected: pd.DataFrame) -> bool:
+    """
+    Check that two DataFrames hold the same rows, index and values.
+
+    Missing values compare equal regardless of how they are represented.
+
+    Args:
+        df (pd.DataFrame): DataFrame to check.
+        expected (pd.DataFrame): DataFrame it should match.
+
+    Returns:
+        bool: True if the DataFrames match.
+    """
+    if list(df.columns) != list(expected.columns) or not df.index.equals(
+        expected.index
+    ):
+        return False
+    df = df.astype(object).where(df.notna(), None)
+    expected = expected.astype(object).where(expected.notna(), None)
+    return df.equals(expected)
+
+
+def extract_region_reference(
+    pdf_path: str, region: ExtractionRegion, backend: str = DEFAULT_PDF_BACKEND
+) -> pd.DataFrame:
+    """
+    Reference extraction of a region, filtering the words of whole pages.
+
+    Words are kept if they start within the region's horizontal span and reach
+    into the band between its margins, so words crossing an edge of the region
+    are kept or dropped whole.
+
+    Args:
+        pdf_path (str): Path to the PDF file.
+        region (ExtractionRegion): The region to extract.
+        backend (str): Name of the extraction backend.
+
+    Returns:
+        pd.DataFrame: Words inside the region.
+    """
+    pages = ExtractionRegion(first_page=region.first_page, last_page=region.last_page)
+    df = extract_pdf_text(pdf_path, region=pages, backend=backend)
+    with open_pdf(pdf_path) as pdf:
+        bboxes = {page.page_number: region.crop_bbox(page.bbox) for page in pdf.pages}
+
+    # Pages with nothing kept get an empty band that no word reaches into
+    bounds = np.array(
+        [bboxes[page] or (0, np.inf, 0, -np.inf) for page in df["page"]],
+        dtype=float,
+    ).reshape(-1, 4)
+    x0 = df["x0"].to_numpy(dtype=float)
+    inside = (
+        (x0 >= (-np.inf if region.x0 is None else region.x0))
+        & (x0 < (np.inf if region.x1 is None else region.x1))
+        & (df["y1"].to_numpy() > bounds[:, 1])
+        & (df["y0"].to_numpy() < bounds[:, 3])
+    )
+    return df[inside].reset_index(drop=True)
+
+
+def process_words(df: pd.DataFrame, council: CouncilConfig) -> pd.DataFrame:
+    """
+    Run the pipeline stages after extraction on a council's words.
+
+    Args:
+        df (pd.DataFrame): Extracted words.
+        council (CouncilConfig): The council's parsed config.
+
+    Returns:
+        pd.DataFrame: The final table.
+    """
+    df = assign_intervals_and_values(df, council.gridline_index)
+    for _, stage in record_stages(council):
+        df = stage(df)
+    return transform_df(df, council.unique_identifier, council.normalization)
+
+
+def check_council(pdf_path: str, council: CouncilConfig) -> Dict[str, bool]:
+    """
+    Compare the vectorized pipeline stages with their reference implementations.
+
+    Line band assembly is checked for every council, whatever its row mode.
+    Councils with an extraction region also compare the final table of the
+    cropped extraction with that of the words lying inside the region, and
+    councils cropped to their gridlines check that dropping the words outside
+    the span leaves their records unchanged.
+
+    Args:
+        pdf_path (str): Path to the council PDF.
+        council (CouncilConfig): The council's parsed config.
+
+    Returns:
+        Dict[str, bool]: Whether each stage matches its reference.
+    """
+    unique_identifier = council.unique_identifier
+    df = assign_intervals_and_values(extract_pdf_text(pdf_path), council.gridline_index)
+    consecutive_df = process_consecutive_values(df, unique_identifier)
+
+    # The reference stages were written for an object value column
+    df_reduced = consecutive_df[["text", "value"]].reset_index(drop=True)
+    df_reduced["value"] = df_reduced["value"].astype(object)
+    dataframes_list = split_dataframe_reference(df_reduced, unique_identifier)
+
+    results = {
+        "process_consecutive_values": frames_match(
+            consecutive_df,
+            process_consecutive_values_reference(df, unique_identifier),
+        ),
+        "assemble_records": frames_match(
+            assemble_records(consecutive_df, unique_identifier),
+            process_dataframes_reference(dataframes_list, unique_identifier),
+        ),
+    }
+    line_records = assemble_line_records(sort_line_bands(df), unique_identifier)
+    line_reference = line_records_reference(df, unique_identifier)
+    results["assemble_line_records"] = set(line_records.columns) == set(
+        line_reference.columns
+    ) and frames_match(line_records, line_reference[list(line_records.columns)])
+    if not council.region.is_full:
+        region_words = extract_pdf_text(
+            pdf_path, region=council.region, backend=council.backend
+        )
+        reference_words = extract_region_reference(
+            pdf_path, council.region, council.backend
+        )
+        reference_records = process_words(reference_words, council)
+        results["extraction_region"] = frames_match(
+            process_words(region_words, council), reference_records
+        )
+        if council.region.x0 is not None or council.region.x1 is not None:
+            # Words outside the span can separate records, so dropping them
+            # must leave the records of the band between the margins unchanged
+            band_words = extract_region_reference(
+                pdf_path, replace(council.region, x0=None, x1=None), council.backend
+            )
+            results["horizontal_span"] = frames_match(
+                reference_records, process_words(band_words, council)
+            )
+    return results
+
+
+def main(
+    pdf_dir: str = "pdf_files/tabular",
+    config_path: str = "data_processor/data/pdf_config.csv",
+) -> int:
+    """
+    Check every council PDF in a directory against the reference implementations.
+
+    Args:
+        pdf_dir (str): Directory containing council PDFs named after the council.
+        config_path (str): Path to the PDF config CSV.
+
+    Returns:
+        int: 0 if every stage matched for every council, 1 otherwise.
+    """
+    with open(config_path, encoding="utf-8") as f:
+        pdf_config = parse_pdf_config(f.read())
+    failures = 0
+
+    for pdf_path in sorted(glob.glob(os.path.join(pdf_dir, "*.pdf"))):
+        council = os.path.splitext(os.path.basename(pdf_path))[0]
+        if council not in pdf_config.councils:
+            continue
+        results = check_council(pdf_path, pdf_config.councils[council])
+        for stage, matched in results.items():
+            print(f"{council}: {stage} {'OK' if matched else 'MISMATCH'}")
+            failures += not matched
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(*sys.argv[1:]))
@@ -1,92 +1,286 @@
 import streamlit as st
 import pandas as pd
-import requests
-from io import StringIO
-from typing import Dict
-from variables import AWS_PRESIGNED_URL
+import numpy as np
+import os
+from io import BytesIO
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+from pandas.io.parsers import TextParser
+from typing import Any, Dict, List, Union
+from config_service import read_config
+from instrumentation import PipelineTrace, display_trace, log_trace
+from jobs import Job, JobQueueFull, display_jobs, submit_job
+from previews import display_preview
+from reg_index import upsert_council
+from variables import FINAL_COLUMNS
 
 
-def download_config(file_name: str) -> pd.DataFrame:
+def normalise_header(header: Any) -> str:
     """
-    Download configuration file from S3 bucket and return as a DataFrame.
+    Normalise a column header to snake_case, removing colons.
 
     Args:
-        file_name (str): Name of the file to download.
+        header (Any): Raw header cell value.
 
     Returns:
-        pd.DataFrame: DataFrame containing the downloaded configuration.
+        str: snake_case column name.
     """
-    url = f"{AWS_PRESIGNED_URL}/{file_name}"
-    response = requests.get(url, stream=True)
-    response.raise_for_status()
-    data = response.content.decode("utf-8")
+    return str(header).replace(" ", "_").replace(":", "").strip().lower()
+
+
+def convert_cell(cell) -> Any:
+    """
+    Convert an openpyxl cell to the value pandas.read_excel would read.
+
+    Args:
+        cell: openpyxl cell from a read-only worksheet.
+
+    Returns:
+        Any: The cell value, with blanks as "" and errors as NaN.
+    """
+    if cell.value is None:
+        return ""
+    elif cell.data_type == TYPE_ERROR:
+        return np.nan
+    elif cell.data_type == TYPE_NUMERIC:
+        # Whole numbers are read as int, as pandas does
+        value = int(cell.value)
+        if value == cell.value:
+            return value
+        return float(cell.value)
+    return cell.value
+
+
+def resolve_columns(headers: List[Any], df_mappings: pd.DataFrame) -> Dict[int, str]:
+    """
+    Resolve a header row against the Excel column mappings.
+
+    Args:
+        headers (List[Any]): Raw header cell values, in sheet order.
+        df_mappings (pd.DataFrame): Mappings with raw_value and mapped_value columns.
+
+    Returns:
+        Dict[int, str]: Sheet position of each final column present, in
+            FINAL_COLUMNS order. If several headers map to the same final column,
+            the first one is used.
+    """
+    rename_dict: Dict[str, str] = dict(
+        zip(df_mappings["raw_value"], df_mappings["mapped_value"])
+    )
+
+    # Map each final column to the first header that renames to it
+    positions: Dict[str, int] = {}
+    for position, header in enumerate(headers):
+        if header is None or header == "":
+            continue
+        mapped = rename_dict.get(normalise_header(header))
+        if mapped in FINAL_COLUMNS and mapped not in positions:
+            positions[mapped] = position
+
+    return {positions[col]: col for col in FINAL_COLUMNS if col in positions}
+
+
+def open_workbook(excel_file: Union[bytes, str]) -> Workbook:
+    """
+    Open an Excel file in read-only mode.
+
+    Args:
+        excel_file (Union[bytes, str]): Excel file content in bytes, or its path.
+
+    Returns:
+        Workbook: The opened workbook, to be closed by the caller.
+    """
+    if isinstance(excel_file, bytes):
+        excel_file = BytesIO(excel_file)
+    return load_workbook(excel_file, read_only=True, data_only=True, keep_links=False)
+
+
+def read_header(excel_file: Union[bytes, str]) -> List[Any]:
+    """
+    Read the header row of the first sheet of an Excel file.
+
+    Args:
+        excel_file (Union[bytes, str]): Excel file content in bytes, or its path.
+
+    Returns:
+        List[Any]: Header cell values, in sheet order.
+    """
+    workbook = open_workbook(excel_file)
+    try:
+        sheet = workbook.worksheets[0]
+        sheet.reset_dimensions()
+        header = next(sheet.rows, ())
+        return [convert_cell(cell) for cell in header]
+    finally:
+        workbook.close()
+
+
+def read_mapped_columns(
+    excel_file: Union[bytes, str], df_mappings: pd.DataFrame
+) -> pd.DataFrame:
+    """
+    Read only the mapped columns of the first sheet of an Excel file.
+
+    The header row is read first and resolved against the mappings. The rest
+    of the sheet is then streamed in read-only mode, keeping just the cells of
+    the mapped columns, so unmapped columns are never converted or parsed.
+
+    Args:
+        excel_file (Union[bytes, str]): Excel file content in bytes, or its path.
+        df_mappings (pd.DataFrame): Mappings with raw_value and mapped_value columns.
+
+    Returns:
+        pd.DataFrame: DataFrame with the final columns present in the file, and
+            dates formatted as dd/mm/yyyy strings.
+    """
+    workbook = open_workbook(excel_file)
+    try:
+        sheet = workbook.worksheets[0]
+        # The stored sheet dimensions can be wrong, so read every cell present
+        sheet.reset_dimensions()
+        rows = sheet.rows
+
+        header = next(rows, ())
+        columns = resolve_columns([convert_cell(cell) for cell in header], df_mappings)
+        positions = list(columns)
+
+        data: List[List[Any]] = []
+        last_row_with_data = -1
+        for row in rows:
+            if any(cell.value is not None and cell.value != "" for cell in row):
+                last_row_with_data = len(data)
+            data.append(
+                [
+                    convert_cell(row[position]) if position < len(row) else ""
+                    for position in positions
+                ]
+            )
+    finally:
+        workbook.close()
+
+    # Drop trailing empty rows, keeping empty rows between records as pandas does
+    data = data[: last_row_with_data + 1]
+
+    df = TextParser(
+        data, names=list(columns.values()), header=None, skip_blank_lines=False
+    ).read()
+
+    # Convert date columns to string format to preserve original formatting
+    date_columns = df.select_dtypes(include=["datetime64"]).columns
+    for col in date_columns:
+        df[col] = df[col].dt.strftime("%d/%m/%Y")
 
-    df = pd.read_csv(StringIO(data))
     return df
 
 
+def process_excel_job(
+    job: Job,
+    excel_bytes: bytes,
+    df_mappings: pd.DataFrame,
+    council: str,
+    file_name: str,
+) -> Dict[str, Any]:
+    """
+    Read and map an uploaded Excel file as a background job, updating the
+    council's rows in the registration index.
+
+    Args:
+        job (Job): The job running this function.
+        excel_bytes (bytes): The Excel file content in bytes.
+        df_mappings (pd.DataFrame): Mappings with raw_value and mapped_value columns.
+        council (str): Name of the council the file belongs to.
+        file_name (str): Name of the uploaded file.
+
+    Returns:
+        Dict[str, Any]: The processed records, the pipeline trace and the
+            council name.
+
+    Raises:
+        ValueError: If no column of the file maps to "reg".
+    """
+    trace = PipelineTrace()
+    job.step("Reading mapped columns")
+    df = trace.run("read_mapped_columns", read_mapped_columns, excel_bytes, df_mappings)
+    if "reg" not in df.columns:
+        raise ValueError("'reg' column is missing from the processed data.")
+    upsert_council(df, council, "excel", file_name)
+    log_trace(trace, kind="excel", council=council, file=file_name, rows=len(df))
+    return {"records": df, "trace": trace, "council": council}
+
+
 def app() -> None:
     """
     Main application function for Excel Processor page.
     """
-    df_mappings = download_config("excel_mappings.csv")
+    df_mappings = read_config("excel_mappings.csv")
 
     # Title of the application
     st.title("Excel Processor")
 
-    # File uploader allows user to add their own Excel file
-    uploaded_file = st.file_uploader("Choose an Excel file", type="xlsx")
-
-    process_data = st.button("Process Data")
-
-    if process_data:
-        # To read file as bytes:
-        bytes_data = uploaded_file.getvalue()
-        df = pd.read_excel(bytes_data, sheet_name=0, parse_dates=True)
-        df.columns = [
-            col.replace(" ", "_").replace(":", "").strip().lower() for col in df.columns
-        ]
-
-        # Convert date columns to string format to preserve original formatting
-        date_columns = df.select_dtypes(include=["datetime64"]).columns
-        for col in date_columns:
-            df[col] = df[col].dt.strftime("%d/%m/%Y")
-
-        st.write("Uploaded Excel file:")
-        st.dataframe(df)
-
-        # Create a dictionary for renaming columns
-        rename_dict: Dict[str, str] = dict(
-            zip(df_mappings["raw_value"], df_mappings["mapped_value"])
-        )
-        df.rename(columns=rename_dict, inplace=True)
-
-        final_columns: List[str] = ["reg", "make", "model", "date_from", "date_to"]
-        existing_columns: List[str] = [
-            col for col in final_columns if col in df.columns
-        ]
-        df = df[existing_columns]
-
-        if "reg" not in df.columns:
-            st.error("Error: 'reg' column is missing from the processed data.")
-            return
-
-        st.success(
-            "Validation passed: Required columns are present in the processed data."
-        )
-
-        st.write("Processed Excel file:")
-        st.dataframe(df)
-
-        st.download_button(
-            label="Download Processed Data",
-            data=df.to_csv(index=False),
-            file_name=f"{uploaded_file.name.split('.')[0]}_{pd.Timestamp('now').strftime('%d_%m_%YT%H_%M_%S')}.csv",
-            mime="text/csv",
-        )
-
-    else:
-        pass
+    # File uploader allows user to add their own Excel files
+    uploaded_files = st.file_uploader(
+        "Choose Excel files", type="xlsx", accept_multiple_files=True
+    )
+
+    if not uploaded_files:
+        return
+
+    # Name each output after the file's council, which the user can override
+    files = pd.DataFrame(
+        {
+            "file": [uploaded_file.name for uploaded_file in uploaded_files],
+            "council": [
+                os.path.splitext(uploaded_file.name)[0]
+                for uploaded_file in uploaded_files
+            ],
+        }
+    )
+    files = st.data_editor(
+        files,
+        column_config={
+            "file": st.column_config.TextColumn("File", disabled=True),
+            "council": st.column_config.TextColumn("Council", required=True),
+        },
+        hide_index=True,
+        key=f"excel_councils_{hash(tuple(files['file']))}",
+    )
+
+    if st.button("Process Data"):
+        submitted = []
+        for uploaded_file, council in zip(uploaded_files, files["council"]):
+            try:
+                job_id = submit_job(
+                    process_excel_job,
+                    uploaded_file.getvalue(),
+                    df_mappings,
+                    council,
+                    uploaded_file.name,
+                    description=f"{council}: {uploaded_file.name}",
+                )
+            except JobQueueFull as e:
+                st.error(f"Could not start processing {uploaded_file.name}: {e}")
+                continue
+            submitted.append(job_id)
+        st.session_state["excel_jobs"] = submitted
+
+    job = display_jobs(
+        "excel", "Download All Processed Data", lambda job: job.result["council"]
+    )
+    if job is None:
+        return
+    display_trace(job.result["trace"])
+
+    st.success("Validation passed: Required columns are present in the processed data.")
+
+    display_preview(job.result["records"], "Processed Excel file", f"records_{job.id}")
+
+    timestamp = pd.Timestamp("now").strftime("%d_%m_%YT%H_%M_%S")
+    st.download_button(
+        label="Download Processed Data",
+        data=job.result["records"].to_csv(index=False),
+        file_name=f"{job.result['council']}_{timestamp}.csv",
+        mime="text/csv",
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,232 @@
+import hashlib
+import os
+import pandas as pd
+from typing import Dict, Optional
+from variables import (
+    EXTRACTION_CACHE_DIR,
+    EXTRACTION_CACHE_MAX_BYTES,
+    PIPELINE_VERSION,
+)
+
+
+def hash_pdf(pdf_bytes: bytes) -> str:
+    """
+    Get the content hash used to key a PDF in the cache.
+
+    Args:
+        pdf_bytes (bytes): The PDF file content in bytes.
+
+    Returns:
+        str: SHA-256 of the PDF content.
+    """
+    return hashlib.sha256(pdf_bytes).hexdigest()
+
+
+def words_path(
+    pdf_hash: str,
+    extraction_key: Optional[str] = None,
+    cache_dir: str = EXTRACTION_CACHE_DIR,
+) -> str:
+    """
+    Get the cache path of a PDF's extracted words.
+
+    Args:
+        pdf_hash (str): SHA-256 of the PDF content.
+        extraction_key (Optional[str]): Description of the extraction backend
+            and region, or None if whole pages were extracted with the default
+            backend.
+        cache_dir (str): Cache directory.
+
+    Returns:
+        str: Path of the Parquet file.
+    """
+    if extraction_key is None:
+        return os.path.join(cache_dir, "words", f"{pdf_hash}.parquet")
+    key_hash = hashlib.sha256(extraction_key.encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, "words", f"{pdf_hash}_{key_hash}.parquet")
+
+
+def result_path(
+    pdf_hash: str,
+    config_hash: str,
+    cache_dir: str = EXTRACTION_CACHE_DIR,
+    version: int = PIPELINE_VERSION,
+) -> str:
+    """
+    Get the cache path of a PDF processed with a council config.
+
+    Args:
+        pdf_hash (str): SHA-256 of the PDF content.
+        config_hash (str): Hash of the council config used to process it.
+        cache_dir (str): Cache directory.
+        version (int): Version of the record processing stages.
+
+    Returns:
+        str: Path of the Parquet file.
+    """
+    return os.path.join(
+        cache_dir, "results", f"{pdf_hash}_{config_hash}_v{version}.parquet"
+    )
+
+
+def load_frame(path: str) -> Optional[pd.DataFrame]:
+    """
+    Load a cached DataFrame, marking it as recently used.
+
+    Args:
+        path (str): Path of the Parquet file.
+
+    Returns:
+        Optional[pd.DataFrame]: The cached DataFrame, or None on a miss.
+    """
+    try:
+        df = pd.read_parquet(path)
+    except (FileNotFoundError, OSError):
+        return None
+    # The modification time records the last use for LRU eviction
+    os.utime(path)
+
+    # Parquet only records that a column held strings, which pandas reads back
+    # with Python storage
+    strings = {
+        column: pd.StringDtype("pyarrow")
+        for column, dtype in df.dtypes.items()
+        if isinstance(dtype, pd.StringDtype)
+    }
+    return df.astype(strings) if strings else df
+
+
+def save_frame(
+    path: str,
+    df: pd.DataFrame,
+    cache_dir: str = EXTRACTION_CACHE_DIR,
+    max_bytes: int = EXTRACTION_CACHE_MAX_BYTES,
+) -> None:
+    """
+    Save a DataFrame to the cache and evict old entries beyond the size limit.
+
+    Args:
+        path (str): Path of the Parquet file.
+        df (pd.DataFrame): DataFrame to cache.
+        cache_dir (str): Cache directory.
+        max_bytes (int): Maximum total size of the cache.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    df.to_parquet(temp_path, index=False)
+    os.replace(temp_path, path)
+    evict(cache_dir, max_bytes)
+
+
+def evict(
+    cache_dir: str = EXTRACTION_CACHE_DIR, max_bytes: int = EXTRACTION_CACHE_MAX_BYTES
+) -> None:
+    """
+    Delete the least recently used cache entries until the cache fits max_bytes.
+
+    Args:
+        cache_dir (str): Cache directory.
+        max_bytes (int): Maximum total size of the cache.
+    """
+    entries = []
+    for root, _, files in os.walk(cache_dir):
+        for file_name in files:
+            if file_name.endswith(".parquet"):
+                path = os.path.join(root, file_name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def load_words(
+    pdf_hash: str,
+    extraction_key: Optional[str] = None,
+    cache_dir: str = EXTRACTION_CACHE_DIR,
+) -> Optional[pd.DataFrame]:
+    """
+    Load the cached extract_pdf_text output for a PDF.
+
+    Args:
+        pdf_hash (str): SHA-256 of the PDF content.
+        extraction_key (Optional[str]): Description of the extraction backend
+            and region, or None if whole pages were extracted with the default
+            backend.
+        cache_dir (str): Cache directory.
+
+    Returns:
+        Optional[pd.DataFrame]: The extracted words, or None on a miss.
+    """
+    return load_frame(words_path(pdf_hash, extraction_key, cache_dir))
+
+
+def save_words(
+    pdf_hash: str,
+    df: pd.DataFrame,
+    extraction_key: Optional[str] = None,
+    cache_dir: str = EXTRACTION_CACHE_DIR,
+) -> None:
+    """
+    Cache the extract_pdf_text output for a PDF.
+
+    Args:
+        pdf_hash (str): SHA-256 of the PDF content.
+        df (pd.DataFrame): The extracted words.
+        extraction_key (Optional[str]): Description of the extraction backend
+            and region, or None if whole pages were extracted with the default
+            backend.
+        cache_dir (str): Cache directory.
+    """
+    save_frame(words_path(pdf_hash, extraction_key, cache_dir), df, cache_dir)
+
+
+def load_result(
+    pdf_hash: str, config_hash: str, cache_dir: str = EXTRACTION_CACHE_DIR
+) -> Optional[pd.DataFrame]:
+    """
+    Load the cached processed table for a PDF and council config.
+
+    Args:
+        pdf_hash (str): SHA-256 of the PDF content.
+        config_hash (str): Hash of the council config.
+        cache_dir (str): Cache directory.
+
+    Returns:
+        Optional[pd.DataFrame]: The processed table, with the rows dropped by
+            each filter of transform_df in attrs["dropped"], or None on a miss.
+    """
+    return load_frame(result_path(pdf_hash, config_hash, cache_dir))
+
+
+def save_result(
+    pdf_hash: str,
+    config_hash: str,
+    df: pd.DataFrame,
+    dropped: Optional[Dict[str, int]] = None,
+    cache_dir: str = EXTRACTION_CACHE_DIR,
+) -> None:
+    """
+    Cache the processed table for a PDF and council config.
+
+    Args:
+        pdf_hash (str): SHA-256 of the PDF content.
+        config_hash (str): Hash of the council config.
+        df (pd.DataFrame): The processed table.
+        dropped (Optional[Dict[str, int]]): Rows dropped by each filter of
+            transform_df, stored with the table.
+        cache_dir (str): Cache directory.
+    """
+    df = df.copy(deep=False)
+    df.attrs = {"dropped": dict(dropped or {})}
+    save_frame(result_path(pdf_hash, config_hash, cache_dir), df, cache_dir)
@@ -0,0 +1,252 @@
+import fitz  # PyMuPDF
+import io
+import numpy as np
+import pdfplumber
+from abc import ABC, abstractmethod
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, Union
+from council_config import ExtractionRegion
+from variables import DEFAULT_PDF_BACKEND
+
+# A PDF can be read from a path, its content in bytes, or a binary buffer
+PdfSource = Union[str, bytes, BinaryIO]
+
+# Words of a page as (text, x0, top, x1, bottom) tuples in reading order
+PageWords = List[Tuple[str, float, float, float, float]]
+
+# Words whose tops are this close are on the same line, as in pdfplumber
+LINE_TOLERANCE: float = 3
+
+
+def open_pdf(pdf: PdfSource, **kwargs) -> pdfplumber.PDF:
+    """
+    Open a PDF with pdfplumber from a path, bytes or a binary buffer.
+
+    Args:
+        pdf (PdfSource): Path to the PDF file, its content in bytes, or a buffer.
+        **kwargs: Passed on to pdfplumber.open.
+
+    Returns:
+        pdfplumber.PDF: The opened PDF.
+    """
+    if isinstance(pdf, (bytes, bytearray, memoryview)):
+        pdf = io.BytesIO(pdf)
+    return pdfplumber.open(pdf, **kwargs)
+
+
+def crop_page(
+    page: pdfplumber.page.Page, region: ExtractionRegion
+) -> Optional[pdfplumber.page.Page]:
+    """
+    Crop a page to the band between the region's margins before its words are
+    extracted.
+
+    Characters crossing a margin are clipped to it, and word coordinates stay
+    relative to the full page.
+
+    Args:
+        page (pdfplumber.page.Page): Page to crop.
+        region (ExtractionRegion): The part of the page to keep.
+
+    Returns:
+        Optional[pdfplumber.page.Page]: The cropped page, the page itself if
+            the region covers all of it, or None if it covers none of it.
+    """
+    bbox = region.crop_bbox(page.bbox)
+    if bbox is None:
+        return None
+    if bbox == tuple(page.bbox):
+        return page
+    return page.crop(bbox)
+
+
+def in_span(words: PageWords, region: ExtractionRegion) -> PageWords:
+    """
+    Keep the words starting within the region's horizontal span.
+
+    Words are extracted across the full width of the page and selected whole
+    by their x0, like gridline intervals, rather than cropped at the span's
+    edges, which would cut words crossing them.
+
+    Args:
+        words (PageWords): Words of a page.
+        region (ExtractionRegion): The region to keep words of.
+
+    Returns:
+        PageWords: The kept words in the same order.
+    """
+    if region.x0 is None and region.x1 is None:
+        return words
+    return [word for word in words if region.in_span(word[1])]
+
+
+def reading_order(words: List[Tuple[Any, ...]]) -> PageWords:
+    """
+    Sort word boxes into lines from top to bottom, and left to right within a
+    line, grouping lines the way pdfplumber does.
+
+    Args:
+        words (List[Tuple[Any, ...]]): (x0, top, x1, bottom, text, ...) tuples.
+
+    Returns:
+        PageWords: The words in reading order.
+    """
+    if not words:
+        return []
+    boxes = np.array([word[:4] for word in words], dtype=float)
+
+    # A word starts a new line when its top is more than LINE_TOLERANCE below
+    # the previous top, so lines chain like pdfplumber's clusters
+    by_top = np.argsort(boxes[:, 1], kind="stable")
+    line = np.empty(len(words), dtype=np.int64)
+    line[by_top] = np.concatenate(
+        [[0], np.cumsum(np.diff(boxes[by_top, 1]) > LINE_TOLERANCE)]
+    )
+
+    order = np.lexsort((boxes[:, 0], line))
+    return [(words[i][4], *boxes[i]) for i in order]
+
+
+class Extractor(ABC):
+    """
+    A word extraction backend.
+
+    Every backend yields the words of a page as PageWords, with coordinates in
+    points from the top-left corner of the page, so their output shares the
+    page, text, x0, y0, x1, y1 word table schema.
+
+    Attributes:
+        name (str): Name of the backend in pdf_config.csv.
+        parallel (bool): Whether large documents are worth splitting across a
+            process pool.
+    """
+
+    name: str
+    parallel: bool
+
+    @abstractmethod
+    def open(self, pdf: PdfSource) -> Any:
+        """
+        Open a PDF for extraction.
+
+        Args:
+            pdf (PdfSource): Path to the PDF file, its content in bytes, or a
+                binary buffer.
+
+        Returns:
+            Any: The opened document, usable as a context manager.
+        """
+
+    @abstractmethod
+    def page_count(self, document: Any) -> int:
+        """
+        Get the number of pages in an opened document.
+
+        Args:
+            document (Any): Document returned by open.
+
+        Returns:
+            int: Number of pages.
+        """
+
+    @abstractmethod
+    def page_words(
+        self, document: Any, page_number: int, region: ExtractionRegion
+    ) -> PageWords:
+        """
+        Extract the words of one page in reading order.
+
+        Args:
+            document (Any): Document returned by open.
+            page_number (int): Page to extract (1-based).
+            region (ExtractionRegion): The part of the page to extract.
+
+        Returns:
+            PageWords: The page's words.
+        """
+
+
+class PdfplumberExtractor(Extractor):
+    """
+    Extracts words with pdfplumber's layout analysis.
+    """
+
+    name = "pdfplumber"
+    parallel = True
+
+    def open(self, pdf: PdfSource) -> pdfplumber.PDF:
+        return open_pdf(pdf)
+
+    def page_count(self, document: pdfplumber.PDF) -> int:
+        return len(document.pages)
+
+    def page_words(
+        self, document: pdfplumber.PDF, page_number: int, region: ExtractionRegion
+    ) -> PageWords:
+        page = document.pages[page_number - 1]
+        cropped = crop_page(page, region)
+        words = cropped.extract_words() if cropped is not None else []
+        # Release the page's parsed layout as soon as its words are extracted
+        page.close()
+        return in_span(
+            [
+                (word["text"], word["x0"], word["top"], word["x1"], word["bottom"])
+                for word in words
+            ],
+            region,
+        )
+
+
+class PymupdfExtractor(Extractor):
+    """
+    Extracts words with PyMuPDF, which is much faster than pdfplumber but
+    splits words only at spaces rather than also at gaps between characters.
+    """
+
+    name = "pymupdf"
+    parallel = False
+
+    def open(self, pdf: PdfSource) -> fitz.Document:
+        if isinstance(pdf, str):
+            return fitz.open(pdf)
+        if not isinstance(pdf, (bytes, bytearray, memoryview)):
+            pdf = pdf.getvalue() if isinstance(pdf, io.BytesIO) else pdf.read()
+        return fitz.open(stream=pdf, filetype="pdf")
+
+    def page_count(self, document: fitz.Document) -> int:
+        return document.page_count
+
+    def page_words(
+        self, document: fitz.Document, page_number: int, region: ExtractionRegion
+    ) -> PageWords:
+        page = document.load_page(page_number - 1)
+        bbox = region.crop_bbox(tuple(page.rect))
+        if bbox is None:
+            return []
+        clip = None if bbox == tuple(page.rect) else fitz.Rect(bbox)
+        # Without TEXT_PRESERVE_LIGATURES ligatures are expanded, as in pdfplumber
+        words = page.get_text("words", clip=clip, flags=fitz.TEXT_MEDIABOX_CLIP)
+        return in_span(reading_order(words), region)
+
+
+EXTRACTORS: Dict[str, Extractor] = {
+    extractor.name: extractor
+    for extractor in (PdfplumberExtractor(), PymupdfExtractor())
+}
+
+
+def get_extractor(backend: str = DEFAULT_PDF_BACKEND) -> Extractor:
+    """
+    Get a word extraction backend by name.
+
+    Args:
+        backend (str): Name of the backend, one of PDF_BACKENDS.
+
+    Returns:
+        Extractor: The backend.
+
+    Raises:
+        ValueError: If there is no backend with that name.
+    """
+    if backend not in EXTRACTORS:
+        raise ValueError(f"Unknown extraction backend: {backend}")
+    return EXTRACTORS[backend]
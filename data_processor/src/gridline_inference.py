@@ -0,0 +1,248 @@
+import sys
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List
+from council_config import FULL_REGION, ExtractionRegion
+from extractors import PdfSource, get_extractor
+from pdf_processor import extract_page_words, sort_line_bands
+from variables import (
+    DEFAULT_PDF_BACKEND,
+    GRIDLINE_BIN_WIDTH,
+    GRIDLINE_EXAMPLES,
+    GRIDLINE_GUTTER_FRACTION,
+    GRIDLINE_MIN_GAP,
+    GRIDLINE_SAMPLE_PAGES,
+    GRIDLINE_TABLE_GAP,
+)
+
+
+def sample_page_numbers(first: int, stop: int, sample_pages: int) -> List[int]:
+    """
+    Choose pages spread evenly through a page range, including its first and
+    last page.
+
+    Args:
+        first (int): First page of the range (1-based).
+        stop (int): Page after the last page of the range.
+        sample_pages (int): Number of pages to choose.
+
+    Returns:
+        List[int]: The chosen page numbers in order, fewer than sample_pages if
+            the range is shorter.
+    """
+    if stop <= first:
+        return []
+    pages = np.linspace(first, stop - 1, max(sample_pages, 1)).round()
+    return np.unique(pages.astype(int)).tolist()
+
+
+def sample_words(
+    pdf: PdfSource,
+    sample_pages: int = GRIDLINE_SAMPLE_PAGES,
+    backend: str = DEFAULT_PDF_BACKEND,
+    region: ExtractionRegion = FULL_REGION,
+) -> pd.DataFrame:
+    """
+    Extract the words of a few pages spread through a PDF.
+
+    Args:
+        pdf (PdfSource): Path to the PDF file, its content in bytes, or a
+            binary buffer.
+        sample_pages (int): Number of pages to sample.
+        backend (str): Name of the extraction backend, one of PDF_BACKENDS.
+        region (ExtractionRegion): The pages, and the part of each page, to
+            sample words from.
+
+    Returns:
+        pd.DataFrame: Words of the sampled pages.
+    """
+    extractor = get_extractor(backend)
+    with extractor.open(pdf) as document:
+        first, stop = region.page_range(extractor.page_count(document))
+        pages = sample_page_numbers(first, stop, sample_pages)
+        return extract_page_words(document, pages, extractor, region=region)
+
+
+def table_lines(
+    words: pd.DataFrame, table_gap: float = GRIDLINE_TABLE_GAP
+) -> pd.DataFrame:
+    """
+    Keep the words of lines that look like table rows.
+
+    A line is a table row if two neighbouring words on it are at least
+    table_gap apart, so titles and paragraphs of prose, whose words are only
+    separated by spaces, do not hide the gaps between columns.
+
+    Args:
+        words (pd.DataFrame): Extracted words.
+        table_gap (float): Narrowest gap in points between columns of a row.
+
+    Returns:
+        pd.DataFrame: Words on table rows, sorted into line bands.
+    """
+    words = sort_line_bands(words)
+    band = words["band"].to_numpy()
+    x0 = words["x0"].to_numpy(dtype=float)
+    x1 = words["x1"].to_numpy(dtype=float)
+
+    gap = np.zeros(len(words))
+    same_band = band[1:] == band[:-1]
+    gap[1:][same_band] = (x0[1:] - x1[:-1])[same_band]
+
+    is_table = np.zeros(band[-1] + 1 if len(band) else 0, dtype=bool)
+    is_table[band[gap >= table_gap]] = True
+    return words[is_table[band]]
+
+
+def edge_histogram(
+    x0: np.ndarray, x1: np.ndarray, bin_width: float = GRIDLINE_BIN_WIDTH
+) -> np.ndarray:
+    """
+    Count the words covering each bin of the page width.
+
+    Word starts add one and word ends subtract one from a histogram of x0 and
+    x1 positions, so its cumulative sum is the number of words over each bin.
+
+    Args:
+        x0 (np.ndarray): Left edge of each word in points.
+        x1 (np.ndarray): Right edge of each word in points.
+        bin_width (float): Width of a bin in points.
+
+    Returns:
+        np.ndarray: Number of words covering each bin, from x = 0.
+    """
+    if len(x0) == 0:
+        return np.zeros(0, dtype=np.int64)
+    start = np.floor(np.clip(x0, 0, None) / bin_width).astype(np.int64)
+    stop = np.ceil(np.clip(x1, 0, None) / bin_width).astype(np.int64)
+    stop = np.maximum(stop, start + 1)
+    bins = int(stop.max())
+    edges = np.bincount(start, minlength=bins + 1) - np.bincount(
+        stop, minlength=bins + 1
+    )
+    return np.cumsum(edges)[:bins]
+
+
+def infer_columns(
+    words: pd.DataFrame,
+    min_gap: float = GRIDLINE_MIN_GAP,
+    table_gap: float = GRIDLINE_TABLE_GAP,
+    gutter_fraction: float = GRIDLINE_GUTTER_FRACTION,
+    bin_width: float = GRIDLINE_BIN_WIDTH,
+) -> pd.DataFrame:
+    """
+    Infer the columns of a table from the horizontal positions of its words.
+
+    Columns are the runs of bins covered by words on table rows, separated by
+    gutters of at least min_gap points that almost no word covers. Each
+    gutter is split at its middle, so every word starting inside a column
+    falls in its interval, as words are assigned by their x0.
+
+    Args:
+        words (pd.DataFrame): Extracted words, usually from sample_words.
+        min_gap (float): Narrowest gutter in points between two columns.
+        table_gap (float): Narrowest gap in points between columns of a row.
+        gutter_fraction (float): Bins covered by fewer words than this
+            fraction of the most covered bin belong to gutters.
+        bin_width (float): Width of a histogram bin in points.
+
+    Returns:
+        pd.DataFrame: One row per column from left to right, with its interval
+            start and end, the number of words starting in it, and its most
+            common words as examples.
+    """
+    words = table_lines(words, table_gap)
+    coverage = edge_histogram(
+        words["x0"].to_numpy(dtype=float), words["x1"].to_numpy(dtype=float), bin_width
+    )
+    if len(coverage) == 0:
+        return pd.DataFrame(columns=["start", "end", "words", "examples"])
+
+    covered = np.concatenate([[0], coverage > gutter_fraction * coverage.max(), [0]])
+    edges = np.flatnonzero(np.diff(covered.astype(np.int8)))
+    run_starts, run_stops = edges[::2], edges[1::2]
+
+    # Gaps narrower than min_gap are spaces within a column
+    new_column = np.ones(len(run_starts), dtype=bool)
+    new_column[1:] = (run_starts[1:] - run_stops[:-1]) * bin_width >= min_gap
+    starts = run_starts[new_column] * bin_width
+    ends = np.maximum.reduceat(run_stops, np.flatnonzero(new_column)) * bin_width
+
+    middles = np.round((ends[:-1] + starts[1:]) / 2)
+    boundaries = np.concatenate([[np.floor(starts[0])], middles, [np.ceil(ends[-1])]])
+
+    column = np.searchsorted(boundaries, words["x0"].to_numpy(dtype=float), "right") - 1
+    inside = (column >= 0) & (column < len(starts))
+    examples = [
+        ", ".join(words["text"][column == i].value_counts().index[:GRIDLINE_EXAMPLES])
+        for i in range(len(starts))
+    ]
+    return pd.DataFrame(
+        {
+            "start": boundaries[:-1].astype(int),
+            "end": boundaries[1:].astype(int),
+            "words": np.bincount(column[inside], minlength=len(starts)),
+            "examples": examples,
+        }
+    )
+
+
+def build_gridlines(
+    columns: pd.DataFrame, unique_identifier: str
+) -> List[Dict[str, Any]]:
+    """
+    Turn labelled columns into gridlines in the pdf_config.csv format.
+
+    Columns without a label are left out, and neighbouring columns with the
+    same label are merged into one interval. The unique identifier's
+    gridlines come first, as the first gridline's label starts each record.
+
+    Args:
+        columns (pd.DataFrame): Columns from infer_columns with a label column.
+        unique_identifier (str): Label of the column that starts each record.
+
+    Returns:
+        List[Dict[str, Any]]: List of gridline dictionaries.
+    """
+    gridlines: List[Dict[str, Any]] = []
+    for start, end, label in zip(columns["start"], columns["end"], columns["label"]):
+        label = "" if pd.isna(label) else str(label).strip()
+        if not label:
+            gridlines.append({})
+            continue
+        previous = gridlines[-1] if gridlines else {}
+        if previous.get("label") == label and previous["interval"][1] == start:
+            previous["interval"][1] = int(end)
+        else:
+            gridlines.append({"interval": [int(start), int(end)], "label": label})
+
+    gridlines = [gridline for gridline in gridlines if gridline]
+    return sorted(
+        gridlines, key=lambda gridline: gridline["label"] != unique_identifier
+    )
+
+
+def main(pdf_path: str, sample_pages: str = str(GRIDLINE_SAMPLE_PAGES)) -> int:
+    """
+    Print the columns inferred for a PDF, with gridlines labelled by position
+    for pdf_config.csv.
+
+    Args:
+        pdf_path (str): Path to the PDF file.
+        sample_pages (str): Number of pages to sample.
+
+    Returns:
+        int: 1 if no columns were found, 0 otherwise.
+    """
+    columns = infer_columns(sample_words(pdf_path, int(sample_pages)))
+    if columns.empty:
+        print(f"No table columns found in {pdf_path}")
+        return 1
+    print(columns.to_string(index=False))
+    columns["label"] = [f"column_{i + 1}" for i in range(len(columns))]
+    print(build_gridlines(columns, columns["label"].iloc[0]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(*sys.argv[1:]))
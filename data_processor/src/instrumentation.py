@@ -0,0 +1,208 @@
+import streamlit as st
+import json
+import logging
+import time
+import psutil
+import pandas as pd
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StageRecord:
+    """
+    Measurements of one pipeline stage, summed over every call to it.
+
+    Attributes:
+        name (str): Name of the stage.
+        calls (int): Number of times the stage ran.
+        seconds (float): Total wall time.
+        rows_in (Optional[int]): Total rows of the input DataFrames, if any.
+        rows_out (Optional[int]): Total rows of the output DataFrames, if any.
+        memory_delta_mb (float): Total change in process RSS across the calls.
+        dropped (Dict[str, int]): Rows dropped by each filter in the stage.
+    """
+
+    name: str
+    calls: int = 0
+    seconds: float = 0.0
+    rows_in: Optional[int] = None
+    rows_out: Optional[int] = None
+    memory_delta_mb: float = 0.0
+    dropped: Dict[str, int] = field(default_factory=dict)
+
+
+def count_rows(value: Any) -> Optional[int]:
+    """
+    Count the rows of a stage input or output.
+
+    Args:
+        value (Any): Stage input or output.
+
+    Returns:
+        Optional[int]: Number of rows if value is a DataFrame, otherwise None.
+    """
+    if isinstance(value, pd.DataFrame):
+        return len(value)
+    return None
+
+
+def add_rows(total: Optional[int], rows: Optional[int]) -> Optional[int]:
+    """
+    Add a row count to a running total, where either may be unknown.
+
+    Args:
+        total (Optional[int]): Running total.
+        rows (Optional[int]): Rows to add.
+
+    Returns:
+        Optional[int]: The new total.
+    """
+    if rows is None:
+        return total
+    return rows if total is None else total + rows
+
+
+def rss_mb() -> float:
+    """
+    Get the resident set size of this process.
+
+    Returns:
+        float: RSS in megabytes.
+    """
+    return psutil.Process().memory_info().rss / (1024 * 1024)
+
+
+class PipelineTrace:
+    """
+    Records duration, row counts and memory of each stage of a pipeline run.
+
+    Stages that run more than once, like the per-page stages of a streamed
+    PDF, are accumulated into a single record.
+    """
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, StageRecord] = {}
+
+    def stage(self, name: str) -> StageRecord:
+        """
+        Get the record of a stage, creating it if needed.
+
+        Args:
+            name (str): Name of the stage.
+
+        Returns:
+            StageRecord: The stage's record.
+        """
+        if name not in self.stages:
+            self.stages[name] = StageRecord(name=name)
+        return self.stages[name]
+
+    def run(self, name: str, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run a stage function and record its measurements.
+
+        The first positional argument is taken as the stage input.
+
+        Args:
+            name (str): Name of the stage.
+            func (Callable): Stage function.
+            *args: Positional arguments passed to func.
+            **kwargs: Keyword arguments passed to func.
+
+        Returns:
+            Any: The stage output.
+        """
+        record = self.stage(name)
+        rows_in = count_rows(args[0]) if args else None
+        start_rss = rss_mb()
+        start = time.perf_counter()
+
+        output = func(*args, **kwargs)
+
+        record.seconds += time.perf_counter() - start
+        record.memory_delta_mb += rss_mb() - start_rss
+        record.calls += 1
+        record.rows_in = add_rows(record.rows_in, rows_in)
+        record.rows_out = add_rows(record.rows_out, count_rows(output))
+        return output
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """
+        Get the stage records as JSON-serialisable dictionaries.
+
+        Returns:
+            List[Dict[str, Any]]: One dictionary per stage, in the order run.
+        """
+        records = []
+        for record in self.stages.values():
+            record = asdict(record)
+            record["seconds"] = round(record["seconds"], 4)
+            record["memory_delta_mb"] = round(record["memory_delta_mb"], 1)
+            records.append(record)
+        return records
+
+    def to_json(self, **fields) -> str:
+        """
+        Get the trace as a single-line JSON record.
+
+        Args:
+            **fields: Extra fields to include, such as the council and file.
+
+        Returns:
+            str: JSON record with the extra fields and a stages list.
+        """
+        return json.dumps({**fields, "stages": self.to_records()})
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Get the trace as a table with one row per stage.
+
+        Returns:
+            pd.DataFrame: Stage table with the dropped rows summarised as text.
+        """
+        df = pd.DataFrame(
+            self.to_records(),
+            columns=[
+                "name",
+                "calls",
+                "seconds",
+                "rows_in",
+                "rows_out",
+                "memory_delta_mb",
+                "dropped",
+            ],
+        )
+        # Nullable integers, so stages without DataFrame rows show blank counts
+        df[["rows_in", "rows_out"]] = df[["rows_in", "rows_out"]].astype("Int64")
+        df["dropped"] = [
+            ", ".join(f"{key}: {count}" for key, count in dropped.items() if count)
+            for dropped in df["dropped"]
+        ]
+        return df.rename(columns={"name": "stage"})
+
+
+def display_trace(trace: PipelineTrace) -> None:
+    """
+    Display a pipeline trace as a compact stage table.
+
+    Args:
+        trace (PipelineTrace): Trace of the pipeline run.
+    """
+    st.write("Pipeline stages")
+    st.dataframe(trace.to_frame(), hide_index=True)
+
+
+def log_trace(trace: PipelineTrace, **fields) -> None:
+    """
+    Log the trace of a pipeline run as one JSON line at INFO level, so runs
+    can be collected from the app and batch logs wherever their logging is
+    routed.
+
+    Args:
+        trace (PipelineTrace): The trace of the run.
+        **fields: Extra fields to include, such as the council and file.
+    """
+    logger.info(trace.to_json(**fields))
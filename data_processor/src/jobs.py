@@ -0,0 +1,369 @@
+import streamlit as st
+import pandas as pd
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+from variables import (
+    JOB_MAX_PENDING,
+    JOB_POLL_SECONDS,
+    JOB_RESULT_TTL_SECONDS,
+    JOB_WORKERS,
+)
+from uploads import download_zip
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class JobCancelled(Exception):
+    """
+    Raised inside a job when its cancellation has been requested.
+    """
+
+
+class JobQueueFull(Exception):
+    """
+    Raised when a job is submitted while JOB_MAX_PENDING jobs are waiting.
+    """
+
+
+@dataclass
+class Job:
+    """
+    A processing job run on the shared worker pool.
+
+    Attributes:
+        id (str): Job id.
+        description (str): What the job processes, for display.
+        status (str): One of queued, running, done, failed or cancelled.
+        done (int): Units of work completed, such as pages extracted.
+        total (int): Units of work in the job, or 0 if not yet known.
+        message (str): Current step of the job, for display.
+        result (Any): Return value of the job function once done.
+        error (Optional[str]): Error message if the job failed.
+        error_traceback (Optional[str]): Traceback of the error, for logs.
+        created_at (float): time.time() when the job was submitted.
+        finished_at (Optional[float]): time.time() when the job finished.
+    """
+
+    id: str
+    description: str
+    status: str = QUEUED
+    done: int = 0
+    total: int = 0
+    message: str = ""
+    result: Any = None
+    error: Optional[str] = None
+    error_traceback: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    cancel_event: threading.Event = field(default_factory=threading.Event)
+    future: Optional[Future] = None
+
+    @property
+    def finished(self) -> bool:
+        """
+        Whether the job has stopped, successfully or not.
+
+        Returns:
+            bool: True if the job is done, failed or cancelled.
+        """
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    def check_cancelled(self) -> None:
+        """
+        Stop the job if its cancellation has been requested.
+
+        Raises:
+            JobCancelled: If cancel_job was called for this job.
+        """
+        if self.cancel_event.is_set():
+            raise JobCancelled(self.id)
+
+    def progress(self, done: int, total: int) -> None:
+        """
+        Report the job's progress, stopping it if it has been cancelled.
+
+        Meant to be passed as the progress callback of long-running stages.
+
+        Args:
+            done (int): Units of work completed.
+            total (int): Units of work in the job.
+
+        Raises:
+            JobCancelled: If cancel_job was called for this job.
+        """
+        self.done, self.total = done, total
+        self.check_cancelled()
+
+    def step(self, message: str) -> None:
+        """
+        Report the job's current step, stopping it if it has been cancelled.
+
+        Args:
+            message (str): Description of the step.
+
+        Raises:
+            JobCancelled: If cancel_job was called for this job.
+        """
+        self.message = message
+        self.check_cancelled()
+
+
+_jobs: Dict[str, Job] = {}
+_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Get the worker pool shared by every session, creating it if needed.
+
+    Returns:
+        ThreadPoolExecutor: The shared worker pool.
+    """
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=JOB_WORKERS, thread_name_prefix="job"
+            )
+        return _executor
+
+
+def run_job(job: Job, func: Callable, args: tuple, kwargs: dict) -> None:
+    """
+    Run a job function on a worker, recording its outcome on the job.
+
+    Args:
+        job (Job): The job being run.
+        func (Callable): Job function, called with the job as first argument.
+        args (tuple): Further positional arguments for func.
+        kwargs (dict): Keyword arguments for func.
+    """
+    try:
+        job.check_cancelled()
+        job.status = RUNNING
+        job.result = func(job, *args, **kwargs)
+        job.status = DONE
+    except JobCancelled:
+        job.status = CANCELLED
+    except Exception as e:
+        job.error = f"{type(e).__name__}: {e}"
+        job.error_traceback = traceback.format_exc()
+        job.status = FAILED
+    finally:
+        job.finished_at = time.time()
+
+
+def prune_jobs(max_age: float = JOB_RESULT_TTL_SECONDS) -> None:
+    """
+    Forget finished jobs older than max_age, releasing their results.
+
+    Args:
+        max_age (float): Seconds a finished job is kept.
+    """
+    now = time.time()
+    with _lock:
+        for job_id in list(_jobs):
+            job = _jobs[job_id]
+            if job.finished and now - job.finished_at > max_age:
+                del _jobs[job_id]
+
+
+def submit_job(func: Callable, *args, description: str = "", **kwargs) -> str:
+    """
+    Submit a job function to the shared worker pool.
+
+    The function is called with the Job as its first argument, so it can report
+    progress with job.progress and job.step, which also stop the job if it is
+    cancelled.
+
+    Args:
+        func (Callable): Job function.
+        *args: Further positional arguments for func.
+        description (str): What the job processes, for display.
+        **kwargs: Keyword arguments for func.
+
+    Returns:
+        str: The job id.
+
+    Raises:
+        JobQueueFull: If JOB_MAX_PENDING jobs are already waiting for a worker.
+    """
+    prune_jobs()
+    executor = get_executor()
+    with _lock:
+        pending = sum(job.status == QUEUED for job in _jobs.values())
+        if pending >= JOB_MAX_PENDING:
+            raise JobQueueFull(f"{pending} jobs are already waiting, try again later")
+
+        job = Job(id=uuid.uuid4().hex, description=description)
+        _jobs[job.id] = job
+        job.future = executor.submit(run_job, job, func, args, kwargs)
+    return job.id
+
+
+def get_job(job_id: str) -> Optional[Job]:
+    """
+    Get a job by id.
+
+    Args:
+        job_id (str): Job id returned by submit_job.
+
+    Returns:
+        Optional[Job]: The job, or None if it is unknown or has been pruned.
+    """
+    with _lock:
+        return _jobs.get(job_id)
+
+
+def cancel_job(job_id: str) -> bool:
+    """
+    Request cancellation of a job.
+
+    A queued job is cancelled at once. A running job stops at its next progress
+    report.
+
+    Args:
+        job_id (str): Job id returned by submit_job.
+
+    Returns:
+        bool: True if the job was still queued or running.
+    """
+    job = get_job(job_id)
+    if job is None or job.finished:
+        return False
+
+    job.cancel_event.set()
+    if job.future is not None and job.future.cancel():
+        job.status = CANCELLED
+        job.finished_at = time.time()
+    return True
+
+
+def job_status_table(jobs: List[Job], unit: str = "pages") -> pd.DataFrame:
+    """
+    Summarise the status of a set of jobs, one row per job.
+
+    Args:
+        jobs (List[Job]): Jobs to summarise.
+        unit (str): Name of the jobs' units of work, for the progress text.
+
+    Returns:
+        pd.DataFrame: Table with the description, status, progress, duration
+            and error of each job.
+    """
+    rows = []
+    for job in jobs:
+        progress = "" if job.finished else job.message
+        if job.total:
+            progress = f"{job.done} of {job.total} {unit}"
+        end = job.finished_at if job.finished_at is not None else time.time()
+        rows.append(
+            {
+                "job": job.description,
+                "status": job.status,
+                "progress": progress,
+                "seconds": round(end - job.created_at, 1),
+                "error": job.error,
+            }
+        )
+    return pd.DataFrame(rows, columns=["job", "status", "progress", "seconds", "error"])
+
+
+def wait_for_jobs(jobs: List[Job], unit: str = "pages") -> bool:
+    """
+    Show the overall progress of a set of jobs with a button to cancel them,
+    rerunning the script until they have all finished.
+
+    Args:
+        jobs (List[Job]): Jobs to wait for.
+        unit (str): Name of the jobs' units of work, for the progress text.
+
+    Returns:
+        bool: True once every job has finished, successfully or not.
+    """
+    running = [job for job in jobs if not job.finished]
+    if not running:
+        return True
+
+    done = sum(job.done for job in jobs)
+    total = sum(job.total for job in jobs)
+    text = f"{len(jobs) - len(running)} of {len(jobs)} finished"
+    if total:
+        text += f", {done} of {total} {unit}"
+    st.progress(done / total if total else 0.0, text=text)
+    if st.button("Cancel", key="cancel_jobs"):
+        for job in running:
+            cancel_job(job.id)
+
+    # Poll by rerunning the script, which the jobs outlive
+    time.sleep(JOB_POLL_SECONDS)
+    st.rerun()
+    return False
+
+
+def display_jobs(
+    prefix: str, label: str, output_name: Callable[[Job], str]
+) -> Optional[Job]:
+    """
+    Display the status of the jobs a page submitted, and once they have all
+    finished, a ZIP download of their records and a choice of job to show.
+
+    Args:
+        prefix (str): Prefix of the page's names, such as "pdf". The ids of the
+            submitted jobs are kept in st.session_state[f"{prefix}_jobs"], and
+            the archive is named {prefix}_processed_{timestamp}.zip.
+        label (str): Label for the ZIP download button.
+        output_name (Callable[[Job], str]): Name of a finished job's CSV file
+            in the archive, without the timestamp and extension.
+
+    Returns:
+        Optional[Job]: The finished job chosen by the user, or None if no job
+            has finished successfully yet.
+    """
+    # Jobs outlive script reruns, so results are fetched from the jobs
+    jobs = [get_job(job_id) for job_id in st.session_state.get(f"{prefix}_jobs", [])]
+    jobs = [job for job in jobs if job is not None]
+    if not jobs:
+        return None
+
+    status = job_status_table(jobs)
+    status["rows"] = pd.array(
+        [len(job.result["records"]) if job.status == DONE else None for job in jobs],
+        dtype="Int64",
+    )
+    st.write("Processing status")
+    st.dataframe(status, hide_index=True)
+    if not wait_for_jobs(jobs):
+        return None
+
+    done = [job for job in jobs if job.status == DONE]
+    if not done:
+        return None
+
+    timestamp = pd.Timestamp("now").strftime("%d_%m_%YT%H_%M_%S")
+    download_zip(
+        label,
+        (
+            (f"{output_name(job)}_{timestamp}.csv", job.result["records"])
+            for job in done
+        ),
+        f"{prefix}_processed_{timestamp}.zip",
+        key=tuple(job.id for job in done),
+    )
+
+    selected = st.selectbox(
+        "Show results for:",
+        range(len(done)),
+        format_func=lambda i: done[i].description,
+    )
+    return done[selected]
@@ -0,0 +1,223 @@
+import hashlib
+import json
+import os
+import time
+import pandas as pd
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional
+from council_config import CouncilConfig
+from excel_processor import read_header, resolve_columns
+from variables import PIPELINE_VERSION
+
+MANIFEST_FILE = "manifest.json"
+
+
+@dataclass
+class ManifestEntry:
+    """
+    Record of how a council's output was produced.
+
+    Attributes:
+        council (str): Name of the council.
+        kind (str): "pdf" or "excel".
+        source (str): Path of the source file.
+        source_hash (str): SHA-256 of the source file.
+        config_hash (str): Hash of the config the council was processed with.
+        output (str): Path of the output file.
+        rows (int): Number of rows written.
+        processed_at (str): When the output was written, in ISO format.
+    """
+
+    council: str
+    kind: str
+    source: str
+    source_hash: str
+    config_hash: str
+    output: str
+    rows: int
+    processed_at: str
+
+
+def entry_key(council: str, kind: str) -> str:
+    """
+    Get the manifest key of a council's output.
+
+    Args:
+        council (str): Name of the council.
+        kind (str): "pdf" or "excel".
+
+    Returns:
+        str: The key, as "{kind}/{council}".
+    """
+    return f"{kind}/{council}"
+
+
+def hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Hash a file without reading it into memory at once.
+
+    Args:
+        path (str): Path of the file.
+        chunk_size (int): Number of bytes read at a time.
+
+    Returns:
+        str: SHA-256 of the file content.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def excel_config_hash(path: str, df_mappings: pd.DataFrame) -> str:
+    """
+    Hash the part of the Excel column mappings that applies to a file.
+
+    Only the columns the file's header resolves to are hashed, so a mappings
+    change that does not affect the file does not make its output stale.
+
+    Args:
+        path (str): Path of the Excel file.
+        df_mappings (pd.DataFrame): Mappings with raw_value and mapped_value columns.
+
+    Returns:
+        str: SHA-256 of the resolved column positions and names.
+    """
+    columns = resolve_columns(read_header(path), df_mappings)
+    return hashlib.sha256(
+        json.dumps(sorted(columns.items())).encode("utf-8")
+    ).hexdigest()
+
+
+def config_hash(source: Dict[str, str], config: Any) -> str:
+    """
+    Hash the config a council file is processed with.
+
+    The hash includes PIPELINE_VERSION, so outputs made by earlier versions of
+    the pipeline stages are stale too.
+
+    Args:
+        source (Dict[str, str]): Source entry from batch.find_sources.
+        config (Any): The council's CouncilConfig for PDF sources, or the Excel
+            column mappings DataFrame for Excel sources.
+
+    Returns:
+        str: Hash of the pipeline version with the council's config hash for
+            PDF sources, or with the mappings that apply to the file for Excel
+            sources.
+    """
+    if isinstance(config, CouncilConfig):
+        council_hash = config.config_hash
+    else:
+        council_hash = excel_config_hash(source["path"], config)
+    return hashlib.sha256(
+        f"{PIPELINE_VERSION}\n{council_hash}".encode("utf-8")
+    ).hexdigest()
+
+
+def manifest_path(output_dir: str) -> str:
+    """
+    Get the path of the manifest in an output directory.
+
+    Args:
+        output_dir (str): Directory holding batch outputs.
+
+    Returns:
+        str: Path of the manifest file.
+    """
+    return os.path.join(output_dir, MANIFEST_FILE)
+
+
+def load_manifest(output_dir: str) -> Dict[str, ManifestEntry]:
+    """
+    Load the manifest of an output directory.
+
+    Args:
+        output_dir (str): Directory holding batch outputs.
+
+    Returns:
+        Dict[str, ManifestEntry]: Entries by entry_key, empty if there is no
+            manifest yet.
+    """
+    try:
+        with open(manifest_path(output_dir), encoding="utf-8") as f:
+            entries = json.load(f)
+    except FileNotFoundError:
+        return {}
+    return {key: ManifestEntry(**entry) for key, entry in entries.items()}
+
+
+def save_manifest(output_dir: str, manifest: Dict[str, ManifestEntry]) -> None:
+    """
+    Save the manifest of an output directory, replacing it atomically.
+
+    Args:
+        output_dir (str): Directory holding batch outputs.
+        manifest (Dict[str, ManifestEntry]): Entries by entry_key.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    path = manifest_path(output_dir)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {key: asdict(entry) for key, entry in sorted(manifest.items())},
+            f,
+            indent=2,
+        )
+    os.replace(temp_path, path)
+
+
+def make_entry(
+    source: Dict[str, str],
+    source_hash: str,
+    config_hash: str,
+    output: str,
+    rows: int,
+) -> ManifestEntry:
+    """
+    Create the manifest entry of a council output that has just been written.
+
+    Args:
+        source (Dict[str, str]): Source entry from batch.find_sources.
+        source_hash (str): SHA-256 of the source file.
+        config_hash (str): Hash of the config it was processed with.
+        output (str): Path of the output file.
+        rows (int): Number of rows written.
+
+    Returns:
+        ManifestEntry: The new entry.
+    """
+    return ManifestEntry(
+        council=source["council"],
+        kind=source["kind"],
+        source=source["path"],
+        source_hash=source_hash,
+        config_hash=config_hash,
+        output=output,
+        rows=rows,
+        processed_at=time.strftime("%Y-%m-%dT%H:%M:%S"),
+    )
+
+
+def is_stale(
+    entry: Optional[ManifestEntry], source_hash: str, config_hash: str
+) -> bool:
+    """
+    Check whether a council's output needs to be reprocessed.
+
+    Args:
+        entry (Optional[ManifestEntry]): The council's manifest entry, if any.
+        source_hash (str): SHA-256 of the current source file.
+        config_hash (str): Hash of the current config.
+
+    Returns:
+        bool: True if the council was never processed, its source or config
+            changed, or its output is missing.
+    """
+    return (
+        entry is None
+        or entry.source_hash != source_hash
+        or entry.config_hash != config_hash
+        or not os.path.exists(entry.output)
+    )
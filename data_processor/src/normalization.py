@@ -0,0 +1,258 @@
+import numpy as np
+import pandas as pd
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from variables import DATE_CACHE_MAX_ENTRIES, FINAL_COLUMNS
+
+# Registrations are letters then a digit, or digits then a letter, then any
+# letters and digits
+REG_PATTERN = r"^(?:[A-Z]+[0-9]|[0-9]+[A-Z])[A-Z0-9]*$"
+
+# Format of parsed dates in processed output
+OUTPUT_DATE_FORMAT = "%d/%m/%Y"
+
+# Separates candidate formats in a council's date_format config
+DATE_FORMAT_SEPARATOR = "|"
+
+# Columns whose whitespace is collapsed and whose case can be normalised
+TEXT_COLUMNS = ["make", "model"]
+
+# Case conversions a council can apply to TEXT_COLUMNS
+TEXT_CASES = ["upper", "lower", "title"]
+
+DATE_COLUMNS = ["date_from", "date_to"]
+
+ARROW_STRING = pd.StringDtype("pyarrow")
+
+
+@dataclass(frozen=True)
+class NormalizationRules:
+    """
+    A council's rules for cleaning and validating assembled records, compiled
+    once per config.
+
+    Attributes:
+        date_formats (Tuple[str, ...]): Candidate date formats, tried in order.
+            Dates are not parsed if empty.
+        text_case (Optional[str]): Case conversion applied to TEXT_COLUMNS, one
+            of TEXT_CASES, or None to keep the case as written.
+        date_cache (Dict[str, Optional[str]]): Formatted date of each date
+            string parsed so far, or None if no format matched.
+    """
+
+    date_formats: Tuple[str, ...]
+    text_case: Optional[str] = None
+    date_cache: Dict[str, Optional[str]] = field(
+        default_factory=dict, compare=False, repr=False
+    )
+
+
+_lock = threading.Lock()
+
+
+def compile_rules(
+    date_format: Optional[str], text_case: Optional[str] = None
+) -> NormalizationRules:
+    """
+    Compile a council's normalization rules.
+
+    Args:
+        date_format (Optional[str]): Date format string, or several separated
+            by DATE_FORMAT_SEPARATOR to try in order.
+        text_case (Optional[str]): Case conversion for TEXT_COLUMNS, one of
+            TEXT_CASES, or None.
+
+    Returns:
+        NormalizationRules: The compiled rules.
+
+    Raises:
+        ValueError: If text_case is not one of TEXT_CASES.
+    """
+    date_formats: List[str] = []
+    if date_format is not None:
+        date_formats = [
+            fmt.strip()
+            for fmt in date_format.split(DATE_FORMAT_SEPARATOR)
+            if fmt.strip()
+        ]
+    if text_case is not None and text_case not in TEXT_CASES:
+        raise ValueError(
+            f"text_case must be one of {', '.join(TEXT_CASES)}: {text_case}"
+        )
+    return NormalizationRules(date_formats=tuple(date_formats), text_case=text_case)
+
+
+def count_dropped(dropped: Optional[Dict[str, int]], key: str, rows: int) -> None:
+    """
+    Add rows dropped by a filter to a running count.
+
+    Args:
+        dropped (Optional[Dict[str, int]]): Counts by filter, updated in place.
+            Nothing is counted if None.
+        key (str): Name of the filter.
+        rows (int): Number of rows dropped.
+    """
+    if dropped is not None:
+        dropped[key] = dropped.get(key, 0) + int(rows)
+
+
+def clean_reg(reg: pd.Series) -> pd.Series:
+    """
+    Remove the spaces from registrations.
+
+    Args:
+        reg (pd.Series): Registrations as Arrow-backed strings.
+
+    Returns:
+        pd.Series: Registrations without spaces.
+    """
+    return reg.str.replace(" ", "", regex=False)
+
+
+def clean_text(text: pd.Series, text_case: Optional[str]) -> pd.Series:
+    """
+    Collapse runs of whitespace, trim, and optionally convert the case of text.
+
+    Args:
+        text (pd.Series): Text as Arrow-backed strings.
+        text_case (Optional[str]): One of TEXT_CASES, or None to keep the case.
+
+    Returns:
+        pd.Series: The cleaned text.
+    """
+    text = text.str.replace(r"\s+", " ", regex=True).str.strip()
+    if text_case == "upper":
+        return text.str.upper()
+    if text_case == "lower":
+        return text.str.lower()
+    if text_case == "title":
+        return text.str.title()
+    return text
+
+
+def parse_date_strings(
+    values: List[str], date_formats: Tuple[str, ...]
+) -> List[Optional[str]]:
+    """
+    Parse date strings with the first candidate format each one matches.
+
+    Args:
+        values (List[str]): Distinct date strings.
+        date_formats (Tuple[str, ...]): Candidate formats, tried in order.
+
+    Returns:
+        List[Optional[str]]: Each date in OUTPUT_DATE_FORMAT, or None if no
+            format matched.
+    """
+    parsed: List[Optional[str]] = [None] * len(values)
+    remaining = np.arange(len(values))
+    for fmt in date_formats:
+        if len(remaining) == 0:
+            break
+        dates = pd.to_datetime(
+            pd.Series([values[i] for i in remaining], dtype=object),
+            format=fmt,
+            errors="coerce",
+        )
+        matched = dates.notna().to_numpy()
+        for i, date in zip(
+            remaining[matched], dates[matched].dt.strftime(OUTPUT_DATE_FORMAT)
+        ):
+            parsed[i] = date
+        remaining = remaining[~matched]
+    return parsed
+
+
+def parse_dates(dates: pd.Series, rules: NormalizationRules) -> pd.Series:
+    """
+    Parse a date column, parsing each distinct date string only once.
+
+    Parsed strings are remembered in the rules' date cache, so dates repeated
+    across the batches of a streamed PDF are not parsed again.
+
+    Args:
+        dates (pd.Series): Dates as Arrow-backed strings.
+        rules (NormalizationRules): The council's compiled rules.
+
+    Returns:
+        pd.Series: Dates in OUTPUT_DATE_FORMAT as Arrow-backed strings, missing
+            where the date was empty or no format matched.
+    """
+    codes, uniques = pd.factorize(dates)
+    uniques = uniques.tolist()
+
+    with _lock:
+        missing = [value for value in uniques if value not in rules.date_cache]
+    parsed = dict(zip(missing, parse_date_strings(missing, rules.date_formats)))
+    with _lock:
+        if len(rules.date_cache) + len(parsed) > DATE_CACHE_MAX_ENTRIES:
+            rules.date_cache.clear()
+        rules.date_cache.update(parsed)
+        formatted = [
+            parsed[value] if value in parsed else rules.date_cache[value]
+            for value in uniques
+        ]
+
+    # The trailing None is picked up by the -1 codes of empty dates
+    values = np.array(formatted + [None], dtype=object)[codes]
+    return pd.Series(pd.array(values, dtype=ARROW_STRING), index=dates.index)
+
+
+def normalize_records(
+    records: pd.DataFrame,
+    rules: NormalizationRules,
+    dropped: Optional[Dict[str, int]] = None,
+) -> pd.DataFrame:
+    """
+    Clean, validate and sort assembled records.
+
+    Every rule is applied to whole columns of Arrow-backed strings, and rows
+    are selected and sorted by registration in a single take at the end.
+
+    Args:
+        records (pd.DataFrame): Assembled records with one column per label.
+        rules (NormalizationRules): The council's compiled rules.
+        dropped (Optional[Dict[str, int]]): If given, the rows dropped by each
+            rule are added to it: "reg_pattern" for registrations that do not
+            match, "{column}_missing" for empty dates and "{column}_unparsed"
+            for dates not matching any format. A row is only counted under the
+            first rule that drops it.
+
+    Returns:
+        pd.DataFrame: The records with FINAL_COLUMNS they have, sorted by reg.
+    """
+    columns = {
+        col: pd.Series(pd.array(records[col], dtype=ARROW_STRING), index=records.index)
+        for col in FINAL_COLUMNS
+        if col in records.columns
+    }
+
+    columns["reg"] = clean_reg(columns["reg"])
+    keep = columns["reg"].str.contains(REG_PATTERN).fillna(False).to_numpy(dtype=bool)
+    count_dropped(dropped, "reg_pattern", len(keep) - keep.sum())
+
+    for col in TEXT_COLUMNS:
+        if col in columns:
+            columns[col] = clean_text(columns[col], rules.text_case)
+
+    for col in DATE_COLUMNS:
+        if col not in columns:
+            continue
+        missing = columns[col].isna().to_numpy()
+        if rules.date_formats:
+            columns[col] = parse_dates(columns[col], rules)
+        rejected = keep & columns[col].isna().to_numpy()
+        count_dropped(dropped, f"{col}_missing", (rejected & missing).sum())
+        count_dropped(dropped, f"{col}_unparsed", (rejected & ~missing).sum())
+        keep &= ~rejected
+
+    # Sort the kept registrations as pandas sorts an object column
+    rows = np.flatnonzero(keep)
+    reg = columns["reg"].to_numpy(dtype=object)[rows]
+    rows = rows[np.argsort(reg, kind="quicksort")]
+
+    return pd.DataFrame(
+        {col: values.array.take(rows) for col, values in columns.items()},
+        index=records.index[rows],
+    )
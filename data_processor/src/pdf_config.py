@@ -1,54 +1,84 @@
 import streamlit as st
 import pandas as pd
-import datetime
-import requests
 from io import StringIO
-from typing import Optional
-from variables import AWS_PRESIGNED_URL
+from config_service import download_config, upload_config
+from council_config import changed_councils, parse_pdf_config
+from extraction_cache import hash_pdf
+from gridline_inference import build_gridlines, infer_columns, sample_words
+from variables import (
+    DEFAULT_PDF_BACKEND,
+    GRIDLINE_MIN_GAP,
+    GRIDLINE_SAMPLE_PAGES,
+    PDF_BACKENDS,
+)
 
 
-def download_config(file_name: str, label: str, mime: str) -> str:
+def infer_gridlines() -> None:
     """
-    Download configuration file from S3 bucket and create a download button.
-
-    Args:
-        file_name (str): Name of the file to download.
-        label (str): Label for the download button.
-        mime (str): MIME type of the file.
-
-    Returns:
-        str: Content of the downloaded file.
+    Propose gridlines for a new council from a few sampled pages of its PDF,
+    and let the user label the inferred columns.
     """
-    url = f"{AWS_PRESIGNED_URL}/{file_name}"
-    response = requests.get(url, stream=True)
-    response.raise_for_status()
-    data = response.content.decode("utf-8")
+    st.subheader("Infer gridlines")
+    uploaded_pdf = st.file_uploader("Upload a council PDF", type="pdf")
+    if uploaded_pdf is None:
+        return
 
-    timestamp = datetime.datetime.now().strftime("%d_%m_%YT%H_%M_%S")
-    file_name_with_timestamp = f"{file_name.split('.')[0]}_{timestamp}.csv"
-    st.download_button(
-        label=label,
-        data=data,
-        file_name=file_name_with_timestamp,
-        mime=mime,
+    cols = st.columns(3)
+    sample_pages = int(
+        cols[0].number_input(
+            "Pages to sample:", min_value=1, value=GRIDLINE_SAMPLE_PAGES
+        )
+    )
+    min_gap = cols[1].number_input(
+        "Narrowest gap between columns (points):",
+        min_value=1.0,
+        value=float(GRIDLINE_MIN_GAP),
+    )
+    backend = cols[2].selectbox(
+        "Backend:", PDF_BACKENDS, index=PDF_BACKENDS.index(DEFAULT_PDF_BACKEND)
     )
-    return data
 
+    # Only sample the PDF again when it or the settings change, not on every
+    # label edit
+    pdf_bytes = uploaded_pdf.getvalue()
+    key = (hash_pdf(pdf_bytes), sample_pages, min_gap, backend)
+    if st.session_state.get("gridline_inference", (None,))[0] != key:
+        words = sample_words(pdf_bytes, sample_pages, backend)
+        st.session_state["gridline_inference"] = (key, infer_columns(words, min_gap))
+    columns = st.session_state["gridline_inference"][1]
+    if columns.empty:
+        st.warning("No table columns were found on the sampled pages.")
+        return
 
-def upload_config() -> None:
-    """
-    Upload configuration file to S3 bucket.
+    st.write(
+        "Label the columns to keep, such as reg, make, model, date_from or "
+        "date_to. Unlabelled columns are left out, and neighbouring columns "
+        "with the same label are merged."
+    )
+    columns = st.data_editor(
+        columns.assign(label=""),
+        column_config={
+            "start": st.column_config.NumberColumn("Start", disabled=True),
+            "end": st.column_config.NumberColumn("End", disabled=True),
+            "words": st.column_config.NumberColumn("Words", disabled=True),
+            "examples": st.column_config.TextColumn("Examples", disabled=True),
+            "label": st.column_config.TextColumn("Label"),
+        },
+        hide_index=True,
+        key=f"gridline_labels_{hash(key)}",
+    )
 
-    Args:
-        uploaded_file: File uploaded by the user.
-    """
-    if uploaded_file is not None:
-        url = f"{AWS_PRESIGNED_URL}/pdf_config.csv"
-        response = requests.put(url, data=uploaded_file)
-        if response.status_code == 200:
-            st.success("File uploaded successfully.")
-        else:
-            st.error(f"Failed to upload file. Status code: {response.status_code}")
+    labels = list(dict.fromkeys(str(label).strip() for label in columns["label"]))
+    labels = [label for label in labels if label and label != "nan"]
+    if not labels:
+        return
+    unique_identifier = st.selectbox(
+        "Unique identifier:",
+        labels,
+        index=labels.index("reg") if "reg" in labels else 0,
+    )
+    st.write("Gridlines for pdf_config.csv:")
+    st.code(str(build_gridlines(columns, unique_identifier)), language="python")
 
 
 def app() -> None:
@@ -56,6 +86,19 @@ def app() -> None:
     Main application function for PDF Config page.
     """
     st.title("PDF Config")
+    st.caption(
+        "Optional columns first_page, last_page, top_margin and bottom_margin "
+        "restrict the pages, and the part of each page, that words are extracted "
+        "from. Set crop_to_gridlines to true to also drop words starting "
+        "outside the gridlines' horizontal span, once equivalence.py reports the "
+        "council's records unchanged, as dropped words no longer separate "
+        "records. Set backend to pymupdf for much faster "
+        "extraction, once conformance.py reports it identical for the council. "
+        "Separate several date formats with | to try them in order, and set "
+        "text_case to upper, lower or title to normalise make and model. Set "
+        "row_mode to line_bands to split records at each printed line holding "
+        "the unique identifier, attaching lines without one to the record above."
+    )
 
     # Download the current config
     data = download_config(
@@ -67,13 +110,37 @@ def app() -> None:
     # Upload a new config
     uploaded_file = st.file_uploader("Upload a new config CSV", type="csv")
     if uploaded_file is not None:
-        upload_config(uploaded_file)
+        # Compare with the config before this upload, which later reruns no
+        # longer download
+        if (
+            st.session_state.get("changed_councils", (None,))[0]
+            != uploaded_file.file_id
+        ):
+            st.session_state["changed_councils"] = (
+                uploaded_file.file_id,
+                changed_councils(
+                    parse_pdf_config(data),
+                    parse_pdf_config(uploaded_file.getvalue().decode("utf-8")),
+                ),
+            )
+        upload_config("pdf_config.csv", uploaded_file)
+
+        # Show which councils need reprocessing with the new config
+        changed = st.session_state["changed_councils"][1]
+        if changed:
+            st.info(
+                f"Config changed for {len(changed)} councils: {', '.join(changed)}. "
+                "Run `python data_processor/src/batch.py --refresh`, which reads "
+                "the uploaded config, to reprocess only these councils."
+            )
 
     # Display the current config
     st.write("Current PDF Config:")
     pdf_config = pd.read_csv(StringIO(data), index_col=0)
     st.dataframe(pdf_config)
 
+    infer_gridlines()
+
 
 if __name__ == "__main__":
     app()
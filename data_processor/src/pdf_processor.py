@@ -1,128 +1,517 @@
 import streamlit as st
 import pandas as pd
-import fitz  # PyMuPDF
+import numpy as np
 import io
-import pdfplumber
-import requests
-from io import StringIO
 import os
-from typing import List, Dict, Tuple, Optional, Any
-from variables import AWS_PRESIGNED_URL
-
-
-def display_first_two_pdf_pages(pdf_bytes: bytes) -> None:
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import pyarrow as pa
+import pyarrow.parquet as pq
+import tempfile
+from contextlib import contextmanager
+from functools import partial
+from typing import (
+    List,
+    Dict,
+    Tuple,
+    Optional,
+    Any,
+    Callable,
+    Union,
+    Iterator,
+    Iterable,
+    Sequence,
+)
+from council_config import (
+    FULL_REGION,
+    CouncilConfig,
+    ExtractionRegion,
+    GridlineIndex,
+    compile_gridlines,
+    load_pdf_config,
+)
+from extractors import Extractor, PdfSource, get_extractor
+from extraction_cache import (
+    hash_pdf,
+    load_words,
+    save_words,
+    load_result,
+    save_result,
+)
+from instrumentation import PipelineTrace, display_trace, log_trace
+from normalization import (
+    NormalizationRules,
+    compile_rules,
+    count_dropped,
+    normalize_records,
+)
+from jobs import Job, JobQueueFull, display_jobs, submit_job
+from previews import display_preview
+from reg_index import upsert_council
+from thumbnails import page_count, render_page
+from uploads import match_council
+from variables import (
+    FINAL_COLUMNS,
+    PDF_EXTRACT_WORKERS,
+    PDF_PARALLEL_MIN_PAGES,
+    PDF_SPILL_THRESHOLD_BYTES,
+    PDF_STREAM_BATCH_ROWS,
+    DEFAULT_PDF_BACKEND,
+    LINE_BAND_TOLERANCE,
+    PIPELINE_VERSION,
+)
+
+
+def display_pdf_pages(pdf_bytes: bytes, pdf_hash: str) -> None:
     """
-    Display the first two pages of a PDF file.
+    Display two consecutive pages of a PDF file, starting at a chosen page.
+
+    Only the displayed pages are rendered, and rendered pages are cached, so
+    reruns that do not change the page do not render again.
 
     Args:
         pdf_bytes (bytes): The PDF file content in bytes.
+        pdf_hash (str): SHA-256 of the PDF content.
     """
-    # Load the PDF file from bytes
-    pdf = fitz.open("pdf", pdf_bytes)
-    num_pages = len(pdf)
+    num_pages = page_count(pdf_bytes, pdf_hash)
+    if num_pages == 0:
+        return
+
+    first_page = 1
+    if num_pages > 2:
+        first_page = int(
+            st.number_input(
+                "Preview from page:", min_value=1, max_value=num_pages - 1, value=1
+            )
+        )
 
     # Create a two-column layout if there are at least two pages, otherwise one column
-    if num_pages >= 2:
-        cols = st.columns(2)
-    else:
-        cols = st.columns(1)
+    page_numbers = [p for p in (first_page, first_page + 1) if p <= num_pages]
+    cols = st.columns(len(page_numbers))
+
+    for col, page_number in zip(cols, page_numbers):
+        image = render_page(pdf_bytes, pdf_hash, page_number)
+        with col:
+            st.image(
+                image,
+                caption=f"Page {page_number} of {num_pages}",
+                use_column_width=True,
+            )
+
+
+PDF_COLUMNS: List[str] = ["page", "text", "x0", "y0", "x1", "y1"]
+
+# Compact word table types: float32 coordinates keep well under a hundredth of
+# a point of precision on a page, and int16 page numbers allow 32767 pages
+WORD_DTYPES: Dict[str, Any] = {
+    "page": np.int16,
+    "text": pd.StringDtype("pyarrow"),
+    "x0": np.float32,
+    "y0": np.float32,
+    "x1": np.float32,
+    "y1": np.float32,
+}
+
+
+def word_table(columns: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+    """
+    Build a word table with the compact WORD_DTYPES column types.
+
+    Args:
+        columns (Optional[Dict[str, Any]]): Values of each of PDF_COLUMNS.
+            Defaults to an empty table.
+
+    Returns:
+        pd.DataFrame: Word table with PDF_COLUMNS.
+    """
+    if columns is None:
+        columns = {col: [] for col in PDF_COLUMNS}
+    return pd.DataFrame(
+        {col: pd.array(columns[col], dtype=WORD_DTYPES[col]) for col in PDF_COLUMNS}
+    )
+
+
+def compact_words(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert a word table to the compact WORD_DTYPES column types.
+
+    Used for word tables cached before the compact types were introduced.
+    Tables that already have them are returned unchanged.
+
+    Args:
+        df (pd.DataFrame): Word table with PDF_COLUMNS.
+
+    Returns:
+        pd.DataFrame: Word table with the compact column types.
+    """
+    if all(df[col].dtype == dtype for col, dtype in WORD_DTYPES.items()):
+        return df
+    return df.astype(WORD_DTYPES)
+
+
+# Called with the number of pages done and the total as extraction progresses
+ProgressCallback = Callable[[int, int], None]
+
+
+def extract_page_words(
+    document: Any,
+    page_numbers: Sequence[int],
+    extractor: Extractor,
+    progress: Optional[ProgressCallback] = None,
+    region: ExtractionRegion = FULL_REGION,
+) -> pd.DataFrame:
+    """
+    Extract text and bounding box information from a sequence of PDF pages.
+
+    Args:
+        document (Any): Document opened by the extractor.
+        page_numbers (Sequence[int]): Pages to extract words from (1-based).
+        extractor (Extractor): Backend extracting the words.
+        progress (Optional[ProgressCallback]): Called after each page.
+        region (ExtractionRegion): The part of each page to extract words from.
+
+    Returns:
+        pd.DataFrame: Word table with the compact WORD_DTYPES column types.
+    """
+    columns: Dict[str, List[Any]] = {col: [] for col in PDF_COLUMNS}
+    for done, page_number in enumerate(page_numbers, start=1):
+        # Extract the text with bounding boxes, one list per column
+        words = extractor.page_words(document, page_number, region)
+        columns["page"].extend([page_number] * len(words))
+        for col, values in zip(PDF_COLUMNS[1:], zip(*words)):
+            columns[col].extend(values)
+        if progress is not None:
+            progress(done, len(page_numbers))
+
+    return word_table(columns)
+
+
+@contextmanager
+def pdf_source(
+    pdf_bytes: Union[bytes, memoryview], spill_bytes: int = PDF_SPILL_THRESHOLD_BYTES
+) -> Iterator[Union[str, io.BytesIO]]:
+    """
+    Provide uploaded PDF content in the form the pipeline should read it from.
+
+    Content up to spill_bytes is wrapped in a BytesIO that shares the uploaded
+    bytes. Larger content is written to a private temporary file, so it is
+    read from disk rather than held in memory twice. The temporary file is
+    deleted on exit.
+
+    Args:
+        pdf_bytes (Union[bytes, memoryview]): The PDF file content in bytes,
+            or a buffer sharing it.
+        spill_bytes (int): Size above which the content is spilled to disk.
+
+    Yields:
+        Union[str, io.BytesIO]: Path to the temporary file, or a buffer.
+    """
+    if len(pdf_bytes) <= spill_bytes:
+        yield io.BytesIO(pdf_bytes)
+        return
+
+    # mkstemp creates the file readable and writable by this user only
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(pdf_bytes)
+        yield path
+    finally:
+        os.remove(path)
+
+
+_extract_pool: Optional[ProcessPoolExecutor] = None
+_extract_pool_lock = threading.Lock()
+
+
+def extract_pool() -> ProcessPoolExecutor:
+    """
+    Get the process pool shared by all PDF extractions in this process.
+
+    The pool is created on first use with PDF_EXTRACT_WORKERS processes, so
+    concurrent jobs share those processes rather than each starting its own.
+    Workers are started with forkserver, or spawn where it is unavailable, as
+    forking the multithreaded app server can deadlock the child processes.
+
+    Returns:
+        ProcessPoolExecutor: The shared process pool.
+    """
+    global _extract_pool
+    with _extract_pool_lock:
+        if _extract_pool is None:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context(
+                "forkserver" if "forkserver" in methods else "spawn"
+            )
+            _extract_pool = ProcessPoolExecutor(
+                max_workers=PDF_EXTRACT_WORKERS, mp_context=context
+            )
+        return _extract_pool
 
-    # Display the first page
-    page = pdf.load_page(0)
-    pix = page.get_pixmap()
-    img_data = pix.tobytes("ppm")
-    image = io.BytesIO(img_data)
-    with cols[0]:
-        st.image(image, caption="First page of the PDF", use_column_width=True)
 
-    # Display the second page if it exists
-    if num_pages >= 2:
-        page = pdf.load_page(1)
-        pix = page.get_pixmap()
-        img_data = pix.tobytes("ppm")
-        image = io.BytesIO(img_data)
-        with cols[1]:
-            st.image(image, caption="Second page of the PDF", use_column_width=True)
+def reset_extract_pool(pool: ProcessPoolExecutor) -> None:
+    """
+    Drop a broken shared process pool, so the next extraction starts a new one.
 
-    # Close the PDF file
-    pdf.close()
+    Args:
+        pool (ProcessPoolExecutor): The pool that broke.
+    """
+    global _extract_pool
+    with _extract_pool_lock:
+        if _extract_pool is pool:
+            _extract_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def extract_page_range(
+    pdf: Union[str, bytes],
+    start: int,
+    stop: int,
+    region: ExtractionRegion = FULL_REGION,
+    backend: str = DEFAULT_PDF_BACKEND,
+) -> pd.DataFrame:
+    """
+    Extract words from a range of pages, opening the PDF independently.
 
+    Args:
+        pdf (Union[str, bytes]): Path to the PDF file, or its content in bytes.
+        start (int): First page number to extract (1-based, inclusive).
+        stop (int): Last page number to extract (1-based, exclusive).
+        region (ExtractionRegion): The part of each page to extract words from.
+        backend (str): Name of the extraction backend.
 
-def extract_pdf_text(pdf_path: str) -> pd.DataFrame:
+    Returns:
+        pd.DataFrame: DataFrame containing extracted text and bounding box information.
+    """
+    extractor = get_extractor(backend)
+    with extractor.open(pdf) as document:
+        return extract_page_words(
+            document, range(start, stop), extractor, region=region
+        )
+
+
+def split_page_ranges(num_pages: int, num_shards: int) -> List[Tuple[int, int]]:
+    """
+    Split the pages of a document into contiguous ranges of similar size.
+
+    Args:
+        num_pages (int): Number of pages in the document.
+        num_shards (int): Number of ranges to split the pages into.
+
+    Returns:
+        List[Tuple[int, int]]: List of (start, stop) 1-based page ranges.
+    """
+    shard_size, remainder = divmod(num_pages, num_shards)
+    ranges = []
+    start = 1
+    for i in range(num_shards):
+        stop = start + shard_size + (1 if i < remainder else 0)
+        if stop > start:
+            ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def extract_pdf_text(
+    pdf_path: PdfSource,
+    max_workers: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None,
+    region: ExtractionRegion = FULL_REGION,
+    backend: str = DEFAULT_PDF_BACKEND,
+) -> pd.DataFrame:
     """
     Extract text and bounding box information from a PDF file.
 
+    Large documents are split into page ranges which are extracted in parallel
+    on the shared process pool and merged back in page order. Documents with fewer than
+    PDF_PARALLEL_MIN_PAGES pages to extract, when max_workers is 1, or with a
+    backend too fast to gain from a pool, are extracted serially. Pages
+    outside the region's page range are never parsed.
+
     Args:
-        pdf_path (str): Path to the PDF file.
+        pdf_path (PdfSource): Path to the PDF file, its content in bytes, or a
+            binary buffer.
+        max_workers (Optional[int]): Number of page ranges to extract at once
+            on the shared pool of PDF_EXTRACT_WORKERS processes. Defaults to
+            PDF_EXTRACT_WORKERS.
+        progress (Optional[ProgressCallback]): Called as pages are extracted,
+            after each page when serial or after each page range when parallel.
+            An exception it raises stops the extraction.
+        region (ExtractionRegion): The pages, and the part of each page, to
+            extract words from.
+        backend (str): Name of the extraction backend, one of PDF_BACKENDS.
 
     Returns:
         pd.DataFrame: DataFrame containing extracted text and bounding box information.
     """
+    if max_workers is None:
+        max_workers = PDF_EXTRACT_WORKERS
+    extractor = get_extractor(backend)
+
     # Open the PDF file
-    with pdfplumber.open(pdf_path) as pdf:
-        # Initialize an empty list to store the extracted data
-        data = []
-        # Iterate through each page
-        for page_num, page in enumerate(pdf.pages):
-            # Extract the text with bounding boxes
-            for element in page.extract_words():
-                text = element["text"]
-                x0, y0, x1, y1 = (
-                    element["x0"],
-                    element["top"],
-                    element["x1"],
-                    element["bottom"],
-                )
-                data.append([page_num + 1, text, x0, y0, x1, y1])
-
-        # Convert the list to a DataFrame
-        df = pd.DataFrame(data, columns=["page", "text", "x0", "y0", "x1", "y1"])
-        return df
+    with extractor.open(pdf_path) as document:
+        first, stop = region.page_range(extractor.page_count(document))
+        num_pages = stop - first
+        if (
+            max_workers <= 1
+            or num_pages < PDF_PARALLEL_MIN_PAGES
+            or not extractor.parallel
+        ):
+            return extract_page_words(
+                document, range(first, stop), extractor, progress, region
+            )
+
+    # Smaller page ranges give finer progress reports, at some cost in overhead
+    num_shards = max_workers if progress is None else max_workers * 4
+    page_ranges = [
+        (start + first - 1, stop + first - 1)
+        for start, stop in split_page_ranges(num_pages, min(num_shards, num_pages))
+    ]
+
+    # Workers open the document themselves by path, so content held in memory
+    # is spilled to a private temporary file rather than sent with every range
+    if isinstance(pdf_path, str):
+        return extract_page_ranges(pdf_path, page_ranges, progress, region, backend)
+    if isinstance(pdf_path, bytes):
+        content: Union[bytes, memoryview] = pdf_path
+    elif isinstance(pdf_path, io.BytesIO):
+        content = pdf_path.getbuffer()
+    else:
+        pdf_path.seek(0)
+        content = pdf_path.read()
+    with pdf_source(content, spill_bytes=0) as path:
+        return extract_page_ranges(path, page_ranges, progress, region, backend)
+
+
+def extract_page_ranges(
+    pdf_path: str,
+    page_ranges: List[Tuple[int, int]],
+    progress: Optional[ProgressCallback] = None,
+    region: ExtractionRegion = FULL_REGION,
+    backend: str = DEFAULT_PDF_BACKEND,
+) -> pd.DataFrame:
+    """
+    Extract page ranges of a PDF in parallel on the shared process pool.
 
+    Args:
+        pdf_path (str): Path to the PDF file.
+        page_ranges (List[Tuple[int, int]]): (start, stop) 1-based page ranges.
+        progress (Optional[ProgressCallback]): Called after each page range
+            with the pages done and the total. An exception it raises stops
+            the extraction.
+        region (ExtractionRegion): The part of each page to extract words from.
+        backend (str): Name of the extraction backend, one of PDF_BACKENDS.
 
-def find_interval(
-    number: float, intervals: List[Tuple[float, float]]
-) -> Optional[Tuple[float, float]]:
+    Returns:
+        pd.DataFrame: Words of the page ranges, in page order.
     """
-    Find the interval that contains a given number.
+    num_pages = sum(stop - start for start, stop in page_ranges)
+    executor = extract_pool()
+    futures = {}
+    try:
+        for start, stop in page_ranges:
+            future = executor.submit(
+                extract_page_range, pdf_path, start, stop, region, backend
+            )
+            futures[future] = stop - start
+        done = 0
+        for future in as_completed(futures):
+            future.result()
+            done += futures[future]
+            if progress is not None:
+                progress(done, num_pages)
+        frames = [future.result() for future in futures]
+    except BrokenProcessPool:
+        reset_extract_pool(executor)
+        raise
+    except BaseException:
+        # Do not wait for the remaining ranges if extraction was stopped
+        for future in futures:
+            future.cancel()
+        raise
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def extract_pdf_text_cached(
+    pdf_path: PdfSource,
+    pdf_hash: str,
+    progress: Optional[ProgressCallback] = None,
+    region: ExtractionRegion = FULL_REGION,
+    backend: str = DEFAULT_PDF_BACKEND,
+) -> pd.DataFrame:
+    """
+    Extract text and bounding boxes from a PDF, reusing a cached extraction.
 
     Args:
-        number (float): The number to find an interval for.
-        intervals (List[Tuple[float, float]]): List of intervals to search.
+        pdf_path (PdfSource): Path to the PDF file, its content in bytes, or a
+            binary buffer.
+        pdf_hash (str): SHA-256 of the PDF content.
+        progress (Optional[ProgressCallback]): Called as pages are extracted.
+        region (ExtractionRegion): The pages, and the part of each page, to
+            extract words from.
+        backend (str): Name of the extraction backend, one of PDF_BACKENDS.
 
     Returns:
-        Optional[Tuple[float, float]]: The interval containing the number, or None if not found.
+        pd.DataFrame: DataFrame containing extracted text and bounding box information.
     """
-    intervals = sorted(intervals)
-    for interval in intervals:
-        if number >= interval[0] and number < interval[1]:
-            return interval
-    return None
+    extraction_key = None
+    if not region.is_full or backend != DEFAULT_PDF_BACKEND:
+        extraction_key = f"{backend} {region!r} v{PIPELINE_VERSION}"
+    df = load_words(pdf_hash, extraction_key)
+    if df is None:
+        df = extract_pdf_text(
+            pdf_path, progress=progress, region=region, backend=backend
+        )
+        save_words(pdf_hash, df, extraction_key)
+    return compact_words(df)
+
+
+def find_intervals(x: np.ndarray, index: GridlineIndex) -> np.ndarray:
+    """
+    Find the interval containing each number.
+
+    Args:
+        x (np.ndarray): Numbers to find intervals for.
+        index (GridlineIndex): Compiled gridlines to search.
+
+    Returns:
+        np.ndarray: Position in index.intervals of the interval containing each
+            number, or -1 if not found.
+    """
+    segment = np.searchsorted(index.boundaries, x, side="right") - 1
+    found = (segment >= 0) & (segment < len(index.segment_interval))
+    positions = np.full(len(x), -1, dtype=np.int64)
+    positions[found] = index.segment_interval[segment[found]]
+    return positions
 
 
 def assign_intervals_and_values(
-    df: pd.DataFrame, gridlines: List[Dict[str, Any]]
+    df: pd.DataFrame, gridlines: Union[List[Dict[str, Any]], GridlineIndex]
 ) -> pd.DataFrame:
     """
     Assign intervals and values to DataFrame based on gridlines.
 
     Args:
         df (pd.DataFrame): Input DataFrame.
-        gridlines (List[Dict[str, Any]]): List of gridline dictionaries.
+        gridlines (Union[List[Dict[str, Any]], GridlineIndex]): List of gridline
+            dictionaries, or the same gridlines already compiled.
 
     Returns:
-        pd.DataFrame: DataFrame with assigned intervals and values.
-    """
-    # Create a list of intervals from the gridlines
-    intervals = [item["interval"] for item in gridlines]
-    df["interval"] = df["x0"].apply(lambda x: find_interval(x, intervals))
-    df["value"] = df["interval"].apply(
-        lambda x: (
-            next((item["label"] for item in gridlines if item["interval"] == x), None)
-            if x
-            else None
-        )
-    )
+        pd.DataFrame: DataFrame with assigned intervals and values. The interval
+            column holds the position of each word's interval in the compiled
+            gridlines' intervals, or -1 for words in no interval.
+    """
+    if not isinstance(gridlines, GridlineIndex):
+        gridlines = compile_gridlines(gridlines)
+
+    positions = find_intervals(df["x0"].to_numpy(dtype=np.float32), gridlines)
+    df["interval"] = positions.astype(np.int16)
+
+    codes = np.append(gridlines.label_codes, -1)[positions]
+    df["value"] = pd.Categorical.from_codes(codes, categories=gridlines.labels)
     return df
 
 
@@ -130,6 +519,10 @@ def process_consecutive_values(df: pd.DataFrame, target_value: str) -> pd.DataFr
     """
     Process consecutive values in DataFrame.
 
+    Each run of consecutive rows whose value is target_value is merged into its
+    first row, joining the text with spaces and extending the bounding box to
+    the largest x1 and y1 in the run. All other rows pass through unchanged.
+
     Args:
         df (pd.DataFrame): Input DataFrame.
         target_value (str): Target value to process.
@@ -137,94 +530,229 @@ def process_consecutive_values(df: pd.DataFrame, target_value: str) -> pd.DataFr
     Returns:
         pd.DataFrame: Processed DataFrame.
     """
-    processed_rows = []
-    current_row = None
-
-    for _, row in df.iterrows():
-        if row["value"] == target_value:
-            if current_row is None:
-                current_row = row.copy()
-            else:
-                # Concatenate the text field
-                current_row["text"] += " " + row["text"]
-                # Update the bounding box
-                current_row["x1"] = max(current_row["x1"], row["x1"])
-                current_row["y1"] = max(current_row["y1"], row["y1"])
-        else:
-            if current_row is not None:
-                processed_rows.append(current_row)
-                current_row = None
-            processed_rows.append(row)
+    is_target = (df["value"] == target_value).to_numpy(dtype=bool)
+    follows_target = np.concatenate([[False], is_target[:-1]])
+
+    # Every row starts a new run unless it continues a run of target rows
+    run_start = ~(is_target & follows_target)
+    run_id = np.cumsum(run_start) - 1
+
+    processed = df[run_start].copy()
+    if is_target.any():
+        merged = (
+            df.loc[is_target, ["text", "x1", "y1"]]
+            .groupby(run_id[is_target], sort=False)
+            .agg({"text": " ".join, "x1": "max", "y1": "max"})
+        )
+        for column in merged.columns:
+            processed.iloc[
+                merged.index.to_numpy(), processed.columns.get_loc(column)
+            ] = merged[column].to_numpy()
 
-    if current_row is not None:
-        processed_rows.append(current_row)
+    return processed
 
-    return pd.DataFrame(processed_rows)
 
+def assemble_records(df: pd.DataFrame, unique_identifier: str) -> pd.DataFrame:
+    """
+    Assemble words into one row per record, with a column per gridline label.
+
+    Every occurrence of the unique identifier starts a new record, and each
+    following word belongs to it until the next occurrence. Words before the
+    first identifier, or outside any gridline, are discarded. The text of all
+    words sharing a record and label is joined with spaces.
+
+    Args:
+        df (pd.DataFrame): Input DataFrame with text and value columns.
+        unique_identifier (str): Label of the column that starts each record.
 
-def split_dataframe(
-    df_reduced: pd.DataFrame, unique_identifier: str
-) -> List[pd.DataFrame]:
+    Returns:
+        pd.DataFrame: Processed DataFrame.
+    """
+    is_identifier = (df["value"] == unique_identifier).to_numpy(dtype=bool)
+    return pivot_records(df, np.cumsum(is_identifier) - 1)
+
+
+def pivot_records(df: pd.DataFrame, record: np.ndarray) -> pd.DataFrame:
     """
-    Split DataFrame into chunks based on unique identifier.
+    Pivot words numbered by record into one row per record, with a column per
+    gridline label.
+
+    Words with a negative record number, or outside any gridline, are
+    discarded. The text of all words sharing a record and label is joined with
+    spaces, in the order the words appear in df.
 
     Args:
-        df_reduced (pd.DataFrame): Input DataFrame.
-        unique_identifier (str): Unique identifier to split on.
+        df (pd.DataFrame): Words with text and value columns.
+        record (np.ndarray): Record number of each word.
 
     Returns:
-        List[pd.DataFrame]: List of split DataFrames.
+        pd.DataFrame: One row per record that has words.
     """
-    # Initialize an empty list to store the dataframes
-    dataframes_list = []
+    keep = (record >= 0) & df["value"].notna().to_numpy()
+    words = pd.DataFrame(
+        {
+            "record": record[keep],
+            "value": np.asarray(df["value"], dtype=object)[keep],
+            "text": df["text"].to_numpy()[keep],
+        }
+    )
+    if words.empty:
+        return pd.DataFrame(columns=pd.Index([], name="value"))
 
-    # Find the indices where "reference_number" appears in the value column
-    reference_indices = df_reduced[df_reduced["value"] == unique_identifier].index
+    new_df = words.groupby(["record", "value"], sort=True)["text"].agg(" ".join)
+    new_df = new_df.unstack("value")
 
-    # Iterate through the indices and create dataframes
-    for i in range(len(reference_indices)):
-        start_idx = reference_indices[i]
-        end_idx = (
-            reference_indices[i + 1]
-            if i + 1 < len(reference_indices)
-            else len(df_reduced)
-        )
-        chunk_df = df_reduced[start_idx:end_idx].reset_index(drop=True)
-        dataframes_list.append(chunk_df)
+    # Order labels alphabetically within the record that first uses them,
+    # appending labels first seen in later records after earlier ones
+    first_record = words.groupby("value")["record"].min()
+    columns = sorted(first_record.index, key=lambda label: (first_record[label], label))
+    new_df = new_df[columns]
+    new_df.columns = pd.Index(columns, name="value")
+    new_df.index = np.zeros(len(new_df), dtype=np.int64)
 
-    return dataframes_list
+    return new_df
 
 
-def process_dataframes(
-    dataframes_list: List[pd.DataFrame], unique_identifier: str
+def sort_line_bands(
+    df: pd.DataFrame, tolerance: float = LINE_BAND_TOLERANCE
 ) -> pd.DataFrame:
     """
-    Process list of DataFrames into a single DataFrame.
+    Sort words into visual line bands, top to bottom and left to right.
+
+    Words are sorted by page and top once, and a new band starts wherever the
+    page changes or a word's top is more than tolerance below the previous
+    word's, so words on the same printed line share a band even when the
+    extraction order interleaves them.
 
     Args:
-        dataframes_list (List[pd.DataFrame]): List of DataFrames to process.
-        unique_identifier (str): Unique identifier column.
+        df (pd.DataFrame): Words with page, x0 and y0 columns.
+        tolerance (float): Largest gap in points between the tops of words on
+            the same band.
+
+    Returns:
+        pd.DataFrame: The words sorted by band then x0, with a band column
+            numbering the bands from 0.
+    """
+    page = df["page"].to_numpy()
+    top = df["y0"].to_numpy(dtype=float)
+    by_top = np.lexsort((top, page))
+
+    new_band = np.ones(len(df), dtype=bool)
+    new_band[1:] = (np.diff(page[by_top]) != 0) | (np.diff(top[by_top]) > tolerance)
+    band = np.empty(len(df), dtype=np.int64)
+    band[by_top] = np.cumsum(new_band) - 1
+
+    x0 = df["x0"].to_numpy(dtype=float)
+    order = by_top[np.lexsort((x0[by_top], band[by_top]))]
+    df = df.iloc[order].reset_index(drop=True)
+    df["band"] = band[order].astype(np.int32)
+    return df
+
+
+def line_record_starts(df: pd.DataFrame, unique_identifier: str) -> np.ndarray:
+    """
+    Find where records start in words sorted by sort_line_bands.
+
+    Args:
+        df (pd.DataFrame): Words sorted into line bands.
+        unique_identifier (str): Label of the column that starts each record.
+
+    Returns:
+        np.ndarray: Position of the first word of every band that contains the
+            unique identifier.
+    """
+    band = df["band"].to_numpy()
+    band_start = np.ones(len(df), dtype=bool)
+    band_start[1:] = band[1:] != band[:-1]
+
+    is_identifier = (df["value"] == unique_identifier).to_numpy(dtype=bool)
+    has_identifier = np.zeros(band[-1] + 1 if len(band) else 0, dtype=bool)
+    has_identifier[band[is_identifier]] = True
+    return np.flatnonzero(band_start & has_identifier[band])
+
+
+def assemble_line_records(df: pd.DataFrame, unique_identifier: str) -> pd.DataFrame:
+    """
+    Assemble words sorted by sort_line_bands into one row per record.
+
+    Every line band containing the unique identifier starts a new record, and
+    bands without it are continuation lines of the preceding record, such as
+    a make or model wrapped onto a second line. All identifier words of a band
+    form its identifier. Bands before the first identifier are discarded, and
+    columns are ordered as in assemble_records.
+
+    Args:
+        df (pd.DataFrame): Words sorted into line bands, with text and value
+            columns.
+        unique_identifier (str): Label of the column that starts each record.
 
     Returns:
         pd.DataFrame: Processed DataFrame.
     """
-    new_dataframes_list = []
+    is_start = np.zeros(len(df), dtype=bool)
+    is_start[line_record_starts(df, unique_identifier)] = True
+    return pivot_records(df, np.cumsum(is_start) - 1)
 
-    for df in dataframes_list:
-        df = df.groupby("value", as_index=False).agg({"text": " ".join})
-        df[unique_identifier] = df[df["value"] == unique_identifier]["text"].iloc[0]
-        df = df.pivot_table(
-            index=unique_identifier, columns="value", values="text", aggfunc="first"
-        )
-        df.reset_index(inplace=True, drop=True)
-        new_dataframes_list.append(df)
 
-    new_df = pd.concat(new_dataframes_list)
-    return new_df
+def record_starts(
+    df: pd.DataFrame, unique_identifier: str, row_mode: str
+) -> np.ndarray:
+    """
+    Find where records start in words ready to be assembled.
+
+    Args:
+        df (pd.DataFrame): Words with assigned values, sorted by
+            sort_line_bands when row_mode is "line_bands".
+        unique_identifier (str): Label of the column that starts each record.
+        row_mode (str): How words are split into records, one of ROW_MODES.
+
+    Returns:
+        np.ndarray: Position of the first word of each record.
+    """
+    if row_mode == "line_bands":
+        return line_record_starts(df, unique_identifier)
+    is_target = (df["value"] == unique_identifier).to_numpy(dtype=bool)
+    follows_target = np.concatenate([[False], is_target[:-1]])
+    return np.flatnonzero(is_target & ~follows_target)
+
+
+def record_stages(council: CouncilConfig) -> List[Tuple[str, Callable]]:
+    """
+    Get the stages that turn a council's assigned words into records.
+
+    Args:
+        council (CouncilConfig): The council's parsed config.
+
+    Returns:
+        List[Tuple[str, Callable]]: Name and function of each stage, in order.
+            Each function takes the previous stage's DataFrame.
+    """
+    unique_identifier = council.unique_identifier
+    if council.row_mode == "line_bands":
+        return [
+            ("sort_line_bands", sort_line_bands),
+            (
+                "assemble_line_records",
+                partial(assemble_line_records, unique_identifier=unique_identifier),
+            ),
+        ]
+    return [
+        (
+            "process_consecutive_values",
+            partial(process_consecutive_values, target_value=unique_identifier),
+        ),
+        (
+            "assemble_records",
+            partial(assemble_records, unique_identifier=unique_identifier),
+        ),
+    ]
 
 
 def transform_df(
-    new_df: pd.DataFrame, unique_identifier: str, date_format: Optional[str]
+    new_df: pd.DataFrame,
+    unique_identifier: str,
+    date_format: Union[Optional[str], NormalizationRules],
+    dropped: Optional[Dict[str, int]] = None,
 ) -> pd.DataFrame:
     """
     Transform DataFrame by applying various operations.
@@ -232,124 +760,464 @@ def transform_df(
     Args:
         new_df (pd.DataFrame): Input DataFrame.
         unique_identifier (str): Unique identifier column.
-        date_format (Optional[str]): Date format string.
+        date_format (Union[Optional[str], NormalizationRules]): Date format
+            string, or the council's compiled normalization rules.
+        dropped (Optional[Dict[str, int]]): If given, the rows dropped by each
+            filter are added to it: "reg_pattern" for registrations that do not
+            match, "{column}_missing" for empty dates and "{column}_unparsed"
+            for dates not matching any date format.
 
     Returns:
         pd.DataFrame: Transformed DataFrame.
     """
-    new_df["reg"] = new_df["reg"].str.replace(" ", "")
+    if not isinstance(date_format, NormalizationRules):
+        date_format = compile_rules(date_format)
+    return normalize_records(new_df, date_format, dropped)
 
-    # Filter rows where "reg" column matches the specified pattern
-    new_df = new_df[
-        new_df["reg"].str.contains(r"^(?:[A-Z]+[0-9]|[0-9]+[A-Z])[A-Z0-9]*$", na=False)
-    ]
-    if date_format is not None:
-        if "date_from" in new_df.columns:
-            new_df["date_from"] = pd.to_datetime(
-                new_df["date_from"], format=date_format, errors="coerce"
-            ).dt.strftime("%d/%m/%Y")
-        if "date_to" in new_df.columns:
-            new_df["date_to"] = pd.to_datetime(
-                new_df["date_to"], format=date_format, errors="coerce"
-            ).dt.strftime("%d/%m/%Y")
-
-    # Remove rows where date format does not match
-    if "date_from" in new_df.columns:
-        new_df = new_df[new_df["date_from"].notna()]
-    if "date_to" in new_df.columns:
-        new_df = new_df[new_df["date_to"].notna()]
-
-    # Select the required columns
-    columns_to_select = ["reg", "make", "model", "date_from", "date_to"]
-    existing_columns = [col for col in columns_to_select if col in new_df.columns]
-    new_df = new_df[existing_columns]
-    new_df = new_df.sort_values(by="reg", ascending=True)
 
-    return new_df
+def output_columns(council: CouncilConfig) -> List[str]:
+    """
+    Get the final columns a council's gridlines can produce.
+
+    Args:
+        council (CouncilConfig): The council's parsed config.
+
+    Returns:
+        List[str]: Final columns labelled by the gridlines, in output order.
+    """
+    return [col for col in FINAL_COLUMNS if col in council.labels]
 
 
-def download_config(file_name: str) -> pd.DataFrame:
+def stream_records(
+    pdf_path: PdfSource,
+    council: CouncilConfig,
+    trace: Optional[PipelineTrace] = None,
+) -> Iterator[pd.DataFrame]:
     """
-    Download configuration file from S3 bucket.
+    Process a PDF page by page, yielding transformed records as they complete.
+
+    A record is complete once the next unique identifier has been seen, so only
+    the words of the last record on a page are carried over to the next page.
+    With the "line_bands" row mode, each page's words are sorted into line
+    bands before records are split.
+    Each batch is transformed separately, so rows are sorted within a batch
+    rather than across the whole document. As in transform_df, rows missing a
+    date are only dropped if the document fills that date column somewhere, so
+    rows are held back until every date column has been seen, and released at
+    the end if one never is.
 
     Args:
-        file_name (str): Name of the file to download.
+        pdf_path (PdfSource): Path to the PDF file, its content in bytes, or a
+            binary buffer.
+        council (CouncilConfig): The council's parsed config.
+        trace (Optional[PipelineTrace]): If given, the measurements of each
+            stage are accumulated into it.
+
+    Yields:
+        pd.DataFrame: Transformed records with the council's output columns.
+    """
+    gridline_index = council.gridline_index
+    unique_identifier = council.unique_identifier
+    columns = output_columns(council)
+    date_columns = [
+        col for col in ("date_from", "date_to") if col in gridline_index.labels
+    ]
+    seen_dates: List[str] = []
+    pending: List[pd.DataFrame] = []
+    if trace is None:
+        trace = PipelineTrace()
+
+    # Line bands are sorted as pages arrive, so that records can be split
+    # between batches in band order
+    stages = record_stages(council)
+    page_stages = stages[:1] if council.row_mode == "line_bands" else []
+    stages = stages[len(page_stages) :]
+
+    def process(words: pd.DataFrame) -> Optional[pd.DataFrame]:
+        new_df = words
+        for name, stage in stages:
+            new_df = trace.run(name, stage, new_df)
+        if new_df.empty:
+            return None
+        seen_dates.extend(
+            col
+            for col in date_columns
+            if col in new_df.columns and col not in seen_dates
+        )
+        # Give every batch all of the council's columns except dates the
+        # document has not filled yet, so rows missing a seen date are dropped
+        # even when the batch has no dates at all
+        new_df = new_df.reindex(
+            columns=[
+                label
+                for label in gridline_index.labels
+                if label not in date_columns or label in seen_dates
+            ]
+        )
+        new_df = trace.run(
+            "transform_df",
+            transform_df,
+            new_df,
+            unique_identifier,
+            council.normalization,
+            dropped=trace.stage("transform_df").dropped,
+        )
+        return new_df.reindex(columns=columns)
+
+    def release(words: pd.DataFrame) -> Iterator[pd.DataFrame]:
+        newly_seen = len(seen_dates)
+        records = process(words)
+        if len(seen_dates) > newly_seen and pending:
+            # Every held row is missing the date column that has just been seen
+            count_dropped(
+                trace.stage("transform_df").dropped,
+                f"{seen_dates[newly_seen]}_missing",
+                sum(len(held) for held in pending),
+            )
+            pending.clear()
+        if records is None:
+            return
+        if len(seen_dates) < len(date_columns):
+            pending.append(records)
+        else:
+            yield records
+
+    carried = None
+    extractor = get_extractor(council.backend)
+    with extractor.open(pdf_path) as document:
+        first, stop = council.region.page_range(extractor.page_count(document))
+        for page_number in range(first, stop):
+            words = trace.run(
+                "extract_pdf_text",
+                extract_page_words,
+                document,
+                [page_number],
+                extractor,
+                region=council.region,
+            )
+            words = trace.run(
+                "assign_intervals_and_values",
+                assign_intervals_and_values,
+                words,
+                gridline_index,
+            )
+            if carried is not None:
+                words = pd.concat([carried, words], ignore_index=True)
+            for name, stage in page_stages:
+                words = trace.run(name, stage, words)
+
+            run_starts = record_starts(words, unique_identifier, council.row_mode)
+
+            # Words before the first unique identifier never belong to a record
+            if len(run_starts) == 0:
+                carried = None
+                continue
+
+            carried = words.iloc[run_starts[-1] :]
+            if len(run_starts) > 1:
+                yield from release(words.iloc[: run_starts[-1]])
+
+    if carried is not None:
+        yield from release(carried)
+    # Date columns the document never fills are not used to drop rows
+    yield from pending
+
+
+def write_records(
+    records: Iterable[pd.DataFrame],
+    output_path: str,
+    columns: List[str],
+    batch_rows: int = PDF_STREAM_BATCH_ROWS,
+) -> int:
+    """
+    Write record batches to a CSV or Parquet file as they arrive.
+
+    Records are buffered until at least batch_rows rows are waiting, then
+    appended to the file, so only one batch is held in memory at a time.
+
+    Args:
+        records (Iterable[pd.DataFrame]): Record batches to write.
+        output_path (str): Path of the .csv or .parquet file to write.
+        columns (List[str]): Columns of the output file.
+        batch_rows (int): Number of rows to buffer before writing.
 
     Returns:
-        pd.DataFrame: DataFrame containing the configuration data.
+        int: Number of rows written.
+    """
+    extension = os.path.splitext(output_path)[1].lower()
+    if extension not in (".csv", ".parquet"):
+        raise ValueError(f"Unsupported output file type: {output_path}")
+
+    schema = pa.schema([(col, pa.string()) for col in columns])
+    parquet_writer = None
+    buffered: List[pd.DataFrame] = []
+    buffered_rows = 0
+    rows_written = 0
+
+    def flush() -> None:
+        nonlocal parquet_writer, buffered, buffered_rows, rows_written
+        batch = (
+            pd.concat(buffered, ignore_index=True)
+            if buffered
+            else pd.DataFrame(columns=columns)
+        )
+        if extension == ".csv":
+            batch.to_csv(
+                output_path,
+                mode="w" if rows_written == 0 else "a",
+                header=rows_written == 0,
+                index=False,
+            )
+        else:
+            if parquet_writer is None:
+                parquet_writer = pq.ParquetWriter(output_path, schema)
+            parquet_writer.write_table(
+                pa.Table.from_pandas(batch, schema=schema, preserve_index=False)
+            )
+        rows_written += len(batch)
+        buffered = []
+        buffered_rows = 0
+
+    try:
+        for batch in records:
+            buffered.append(batch.reindex(columns=columns))
+            buffered_rows += len(batch)
+            if buffered_rows >= batch_rows:
+                flush()
+        # Always flush at the end so an empty document still gets a file header
+        if buffered or rows_written == 0:
+            flush()
+    finally:
+        if parquet_writer is not None:
+            parquet_writer.close()
+
+    return rows_written
+
+
+def process_pdf_to_file(
+    pdf_path: PdfSource,
+    output_path: str,
+    council: CouncilConfig,
+    batch_rows: int = PDF_STREAM_BATCH_ROWS,
+    trace: Optional[PipelineTrace] = None,
+) -> int:
     """
-    url = f"{AWS_PRESIGNED_URL}/{file_name}"
-    response = requests.get(url, stream=True)
-    response.raise_for_status()
-    data = response.content.decode("utf-8")
+    Process a PDF into a CSV or Parquet file with memory bounded by page size.
 
-    df = pd.read_csv(StringIO(data), index_col=0)
-    return df
+    Rows are sorted by reg within each page's records stream_records yields,
+    not across the file, so the file holds the same rows as process_pdf_job's
+    records but not necessarily in the same order.
 
+    Args:
+        pdf_path (PdfSource): Path to the PDF file, its content in bytes, or a
+            binary buffer.
+        output_path (str): Path of the .csv or .parquet file to write.
+        council (CouncilConfig): The council's parsed config.
+        batch_rows (int): Number of rows to buffer before writing.
+        trace (Optional[PipelineTrace]): If given, the measurements of each
+            stage are accumulated into it.
 
-def app() -> None:
+    Returns:
+        int: Number of rows written.
     """
-    Main application function for PDF Processor.
+    return write_records(
+        stream_records(pdf_path, council, trace),
+        output_path,
+        output_columns(council),
+        batch_rows,
+    )
+
+
+def process_pdf_job(
+    job: Job, pdf_bytes: bytes, pdf_hash: str, council: CouncilConfig, file_name: str
+) -> Dict[str, Any]:
     """
-    pdf_config = download_config("pdf_config.csv").transpose().to_dict()
+    Extract and process an uploaded PDF as a background job, updating the
+    council's rows in the registration index.
 
-    # Title of the application
-    st.title("PDF Processor")
-    # File uploader allows user to add their own PDF
-    uploaded_file = st.file_uploader("Choose a PDF file", type="pdf")
+    Args:
+        job (Job): The job running this function, for progress and cancellation.
+        pdf_bytes (bytes): The PDF file content in bytes.
+        pdf_hash (str): SHA-256 of the PDF content.
+        council (CouncilConfig): The council's parsed config.
+        file_name (str): Name of the uploaded file.
 
-    if uploaded_file is not None:
-        # To read file as bytes:
-        bytes_data = uploaded_file.getvalue()
+    Returns:
+        Dict[str, Any]: The extracted words, the processed records, the
+            pipeline trace and the council config used.
+    """
+    trace = PipelineTrace()
+    unique_identifier = council.unique_identifier
+
+    job.step("Extracting words")
+    with pdf_source(pdf_bytes) as source:
+        df = trace.run(
+            "extract_pdf_text",
+            extract_pdf_text_cached,
+            source,
+            pdf_hash,
+            progress=job.progress,
+            region=council.region,
+            backend=council.backend,
+        )
+    words = df[PDF_COLUMNS]
+
+    # Only the stages after extraction depend on the council config
+    job.step("Processing records")
+    new_df = trace.run("load_result", load_result, pdf_hash, council.config_hash)
+    if new_df is None:
+        df = trace.run(
+            "assign_intervals_and_values",
+            assign_intervals_and_values,
+            df,
+            council.gridline_index,
+        )
+        for name, stage in record_stages(council):
+            job.check_cancelled()
+            df = trace.run(name, stage, df)
+        new_df = trace.run(
+            "transform_df",
+            transform_df,
+            df,
+            unique_identifier,
+            council.normalization,
+            dropped=trace.stage("transform_df").dropped,
+        )
+        save_result(
+            pdf_hash,
+            council.config_hash,
+            new_df,
+            dropped=trace.stage("transform_df").dropped,
+        )
+    else:
+        # Keep the rows the cached table's filters dropped in the trace
+        trace.stage("load_result").dropped.update(new_df.attrs.pop("dropped", {}))
+
+    if "reg" in new_df.columns:
+        upsert_council(new_df, council.name, "pdf", file_name)
+
+    log_trace(trace, kind="pdf", council=council.name, file=file_name, rows=len(new_df))
 
-        # Displaying the file
-        st.write("Uploaded PDF file:")
+    return {"words": words, "records": new_df, "trace": trace, "council": council}
 
-        display_first_two_pdf_pages(bytes_data)
 
-        council = st.selectbox("Select Council:", tuple(sorted(pdf_config.keys())))
+def display_job_results(job: Job) -> None:
+    """
+    Display the results of a finished PDF processing job for one file.
 
-        gridlines = eval(pdf_config[council]["gridlines"])
-        unique_identifier = [item["label"] for item in gridlines][0]
-        date_format = pdf_config[council]["date_format"]
-        pdf_path = f"pdf_files/tabular/{council}.pdf"
+    Args:
+        job (Job): A job that ran process_pdf_job successfully.
+    """
+    council_config = job.result["council"]
+    df = job.result["words"]
+    new_df = job.result["records"]
 
-        if st.button("Process PDF"):
+    display_trace(job.result["trace"])
 
-            pdf_path = f"pdf_files/tabular/{council}.pdf"
-            with open(pdf_path, "wb") as f:
-                f.write(uploaded_file.getvalue())
+    display_preview(df, "Pre-processed Data", f"words_{job.id}")
 
-            df = extract_pdf_text(pdf_path)
-            st.write("Pre-processed Data")
-            st.dataframe(df)
+    st.write(
+        {
+            "gridlines": council_config.gridlines,
+            "date_format": council_config.date_format,
+        }
+    )
 
-            st.write(pdf_config[council])
+    if "reg" not in new_df.columns:
+        st.error("Error: 'reg' column is missing from the processed data.")
+        return
 
-            df = assign_intervals_and_values(df, gridlines)
-            df = process_consecutive_values(df, target_value=unique_identifier)
-            df_reduced = df[["text", "value"]].reset_index(drop=True)
-            dataframes_list = split_dataframe(df_reduced, unique_identifier)
-            new_df = process_dataframes(dataframes_list, unique_identifier)
-            new_df = transform_df(new_df, unique_identifier, date_format)
+    st.success("Validation passed: Required columns are present in the processed data.")
 
-            if "reg" not in new_df.columns:
-                st.error("Error: 'reg' column is missing from the processed data.")
-                return
+    display_preview(new_df, "Processed Data", f"records_{job.id}")
 
-            st.success(
-                "Validation passed: Required columns are present in the processed data."
-            )
+    st.download_button(
+        label="Download Processed Data",
+        data=new_df.to_csv(index=False),
+        file_name=f"{council_config.name}_{pd.Timestamp('now').strftime('%d_%m_%YT%H_%M_%S')}.csv",
+        mime="text/csv",
+    )
 
-            st.write("Processed Data")
-            st.dataframe(new_df)
 
-            st.download_button(
-                label="Download Processed Data",
-                data=new_df.to_csv(index=False),
-                file_name=f"{council}_{pd.Timestamp('now').strftime('%d_%m_%YT%H_%M_%S')}.csv",
-                mime="text/csv",
-            )
+def app() -> None:
+    """
+    Main application function for PDF Processor.
+    """
+    pdf_config = load_pdf_config()
+
+    # Title of the application
+    st.title("PDF Processor")
+    for name, error in pdf_config.errors.items():
+        st.warning(f"Skipping invalid config for {name}: {error}")
+    # File uploader allows user to add their own PDFs
+    uploaded_files = st.file_uploader(
+        "Choose PDF files", type="pdf", accept_multiple_files=True
+    )
+
+    if uploaded_files:
+        councils = sorted(pdf_config.councils.keys())
+
+        # Match each file to a council by its name, which the user can override
+        st.write("Uploaded PDF files:")
+        files = pd.DataFrame(
+            {
+                "file": [uploaded_file.name for uploaded_file in uploaded_files],
+                "council": [
+                    match_council(uploaded_file.name, councils)
+                    for uploaded_file in uploaded_files
+                ],
+            }
+        )
+        files = st.data_editor(
+            files,
+            column_config={
+                "file": st.column_config.TextColumn("File", disabled=True),
+                "council": st.column_config.SelectboxColumn(
+                    "Council", options=councils
+                ),
+            },
+            hide_index=True,
+            key=f"pdf_councils_{hash(tuple(files['file']))}",
+        )
+
+        # Displaying a file
+        preview = st.selectbox(
+            "Preview file:",
+            range(len(uploaded_files)),
+            format_func=lambda i: uploaded_files[i].name,
+        )
+        bytes_data = uploaded_files[preview].getvalue()
+        display_pdf_pages(bytes_data, hash_pdf(bytes_data))
+
+        if st.button("Process PDFs"):
+            submitted = []
+            for uploaded_file, council in zip(uploaded_files, files["council"]):
+                if council not in pdf_config.councils:
+                    st.warning(f"Skipping {uploaded_file.name}: no council selected.")
+                    continue
+                bytes_data = uploaded_file.getvalue()
+                try:
+                    job_id = submit_job(
+                        process_pdf_job,
+                        bytes_data,
+                        hash_pdf(bytes_data),
+                        pdf_config.councils[council],
+                        uploaded_file.name,
+                        description=f"{council}: {uploaded_file.name}",
+                    )
+                except JobQueueFull as e:
+                    st.error(f"Could not start processing {uploaded_file.name}: {e}")
+                    continue
+                submitted.append(job_id)
+            st.session_state["pdf_jobs"] = submitted
+
+        job = display_jobs(
+            "pdf",
+            "Download All Processed Data",
+            lambda job: job.result["council"].name,
+        )
+        if job is not None:
+            display_job_results(job)
 
     else:
-        st.write("Please upload a PDF file to process the data.")
+        st.write("Please upload PDF files to process the data.")
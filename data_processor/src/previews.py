@@ -0,0 +1,101 @@
+import streamlit as st
+import numpy as np
+import pandas as pd
+from variables import PREVIEW_PAGE_SIZES
+
+
+def summarize(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Summarise each column of a table without sending its rows anywhere.
+
+    Args:
+        df (pd.DataFrame): Table to summarise.
+
+    Returns:
+        pd.DataFrame: One row per column with its dtype and its numbers of
+            filled and distinct values.
+    """
+    return pd.DataFrame(
+        {
+            "column": [str(column) for column in df.columns],
+            "dtype": [str(dtype) for dtype in df.dtypes],
+            "filled": df.notna().sum().to_numpy(),
+            "distinct": df.nunique().to_numpy(),
+        }
+    )
+
+
+def preview_page(df: pd.DataFrame, page: int, page_size: int) -> pd.DataFrame:
+    """
+    Get one page of a table, indexed by row position.
+
+    Args:
+        df (pd.DataFrame): Table to page through.
+        page (int): Page number (1-based).
+        page_size (int): Rows per page.
+
+    Returns:
+        pd.DataFrame: The rows of the page.
+    """
+    start = (page - 1) * page_size
+    rows = df.iloc[start : start + page_size]
+    return rows.set_axis(pd.RangeIndex(start, start + len(rows)))
+
+
+def preview_sample(df: pd.DataFrame, rows: int, seed: int) -> pd.DataFrame:
+    """
+    Get a random sample of a table's rows in table order, indexed by row
+    position.
+
+    Args:
+        df (pd.DataFrame): Table to sample.
+        rows (int): Number of rows to sample.
+        seed (int): Seed of the random sample.
+
+    Returns:
+        pd.DataFrame: The sampled rows.
+    """
+    positions = np.random.default_rng(seed).choice(
+        len(df), size=min(rows, len(df)), replace=False
+    )
+    positions.sort()
+    return df.iloc[positions].set_axis(positions)
+
+
+def display_preview(df: pd.DataFrame, label: str, key: str) -> None:
+    """
+    Display summary statistics and one page or a random sample of a table.
+
+    Only the rows shown are sent to the browser, and other pages are fetched
+    from the server when asked for, so large tables stay fast to display.
+
+    Args:
+        df (pd.DataFrame): Table to preview.
+        label (str): Heading of the preview.
+        key (str): Prefix of the preview's widget keys, unique on the page.
+    """
+    st.write(f"{label}: {len(df):,} rows, {len(df.columns)} columns")
+    with st.expander("Column summary"):
+        st.dataframe(summarize(df), hide_index=True)
+    if df.empty:
+        return
+
+    cols = st.columns(3)
+    view = cols[0].radio("View:", ["Pages", "Random sample"], key=f"{key}_view")
+    page_size = cols[1].selectbox("Rows:", PREVIEW_PAGE_SIZES, key=f"{key}_rows")
+
+    if view == "Pages":
+        num_pages = -(-len(df) // page_size)
+        page = cols[2].number_input(
+            f"Page (of {num_pages}):",
+            min_value=1,
+            max_value=num_pages,
+            value=1,
+            key=f"{key}_page",
+        )
+        st.dataframe(preview_page(df, int(page), page_size))
+    else:
+        seed_key = f"{key}_seed"
+        if cols[2].button("New sample", key=f"{key}_resample"):
+            st.session_state[seed_key] = st.session_state.get(seed_key, 0) + 1
+        st.dataframe(preview_sample(df, page_size, st.session_state.get(seed_key, 0)))
@@ -0,0 +1,244 @@
+import fcntl
+import os
+import re
+import threading
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional, Tuple
+from variables import FINAL_COLUMNS, REG_INDEX_PATH
+
+INDEX_COLUMNS = ["reg", "council", "kind", "source"] + FINAL_COLUMNS[1:]
+
+INDEX_SCHEMA = pa.schema([(col, pa.string()) for col in INDEX_COLUMNS])
+
+
+@dataclass
+class RegIndex:
+    """
+    The merged index of processed council outputs, sorted by registration.
+
+    Attributes:
+        table (pd.DataFrame): Index rows with INDEX_COLUMNS, sorted by reg and
+            then council.
+        regs (np.ndarray): The reg column as a fixed-width string array, for
+            binary search.
+    """
+
+    table: pd.DataFrame
+    regs: np.ndarray
+
+    def lookup(self, reg: str) -> pd.DataFrame:
+        """
+        Find every index row for a registration.
+
+        Args:
+            reg (str): Registration to look up, normalised before searching.
+
+        Returns:
+            pd.DataFrame: Matching rows, one per council record.
+        """
+        key = normalise_reg(reg)
+        start = np.searchsorted(self.regs, key, side="left")
+        stop = np.searchsorted(self.regs, key, side="right")
+        return self.table.iloc[start:stop]
+
+    def prefix(self, prefix: str, limit: Optional[int] = None) -> pd.DataFrame:
+        """
+        Find the index rows of registrations starting with a prefix.
+
+        Args:
+            prefix (str): Start of the registration, normalised before searching.
+            limit (Optional[int]): Maximum number of rows to return.
+
+        Returns:
+            pd.DataFrame: Matching rows in registration order.
+        """
+        key = normalise_reg(prefix)
+        start = np.searchsorted(self.regs, key, side="left")
+        if key:
+            # The smallest string greater than every string starting with key
+            upper = key[:-1] + chr(ord(key[-1]) + 1)
+            stop = np.searchsorted(self.regs, upper, side="left")
+        else:
+            stop = len(self.regs)
+        if limit is not None:
+            stop = min(stop, start + limit)
+        return self.table.iloc[start:stop]
+
+
+_indexes: Dict[str, Tuple[int, RegIndex]] = {}
+_lock = threading.Lock()
+
+
+def normalise_reg(reg: str) -> str:
+    """
+    Normalise a registration for use as the index key.
+
+    Args:
+        reg (str): Registration as written in a council file.
+
+    Returns:
+        str: The registration in upper case without spaces or punctuation.
+    """
+    return re.sub(r"[^A-Z0-9]", "", str(reg).upper())
+
+
+def index_rows(
+    records: pd.DataFrame, council: str, kind: str, source: str
+) -> pd.DataFrame:
+    """
+    Convert a council's processed records into index rows.
+
+    Args:
+        records (pd.DataFrame): Processed records with some of FINAL_COLUMNS.
+        council (str): Name of the council.
+        kind (str): "pdf" or "excel".
+        source (str): Name of the file the records were processed from.
+
+    Returns:
+        pd.DataFrame: Index rows with INDEX_COLUMNS, without empty registrations.
+    """
+    rows = pd.DataFrame(index=range(len(records)), columns=INDEX_COLUMNS, dtype=object)
+    rows["reg"] = (
+        records["reg"]
+        .astype(str)
+        .str.upper()
+        .str.replace(r"[^A-Z0-9]", "", regex=True)
+        .to_numpy()
+    )
+    rows["council"] = council
+    rows["kind"] = kind
+    rows["source"] = source
+    for col in FINAL_COLUMNS[1:]:
+        if col in records.columns:
+            values = records[col].astype("string").astype(object)
+            rows[col] = values.where(records[col].notna(), None).to_numpy()
+
+    has_reg = records["reg"].notna().to_numpy() & (rows["reg"] != "").to_numpy()
+    return rows[has_reg]
+
+
+def read_index_table(path: str = REG_INDEX_PATH) -> pd.DataFrame:
+    """
+    Read the index file, or an empty index if it does not exist yet.
+
+    Args:
+        path (str): Path of the index Parquet file.
+
+    Returns:
+        pd.DataFrame: Index rows with INDEX_COLUMNS, sorted by reg and council.
+    """
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=INDEX_COLUMNS, dtype=object)
+    return pq.read_table(path, schema=INDEX_SCHEMA).to_pandas()
+
+
+def load_index(path: str = REG_INDEX_PATH) -> RegIndex:
+    """
+    Load the index for lookups, reusing it until the file changes.
+
+    Args:
+        path (str): Path of the index Parquet file.
+
+    Returns:
+        RegIndex: The loaded index.
+    """
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        mtime = 0
+
+    with _lock:
+        cached = _indexes.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+    table = read_index_table(path)
+    index = RegIndex(table=table, regs=table["reg"].to_numpy(dtype=str))
+    with _lock:
+        _indexes[path] = (mtime, index)
+    return index
+
+
+@contextmanager
+def index_lock(path: str = REG_INDEX_PATH) -> Iterator[None]:
+    """
+    Hold the lock on an index file shared by every process updating it.
+
+    The app's jobs and batch.py run in separate processes, so an exclusive
+    flock on a .lock file next to the index serialises their rewrites.
+
+    Args:
+        path (str): Path of the index Parquet file.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(f"{path}.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def upsert_councils(
+    councils: Dict[Tuple[str, str], pd.DataFrame], path: str = REG_INDEX_PATH
+) -> None:
+    """
+    Replace the rows of several councils in the index in one rewrite.
+
+    Rows of other councils are kept as they are. The index is rewritten in
+    registration order and replaced atomically, so readers never see a
+    partial file, and the whole update holds index_lock, so concurrent
+    updates from other processes are not lost.
+
+    Args:
+        councils (Dict[Tuple[str, str], pd.DataFrame]): Index rows from
+            index_rows for each (council, kind). An empty DataFrame removes the
+            council from the index.
+        path (str): Path of the index Parquet file.
+    """
+    with _lock, index_lock(path):
+        table = read_index_table(path)
+        replaced = pd.MultiIndex.from_tuples(list(councils), names=["council", "kind"])
+        keep = ~pd.MultiIndex.from_frame(table[["council", "kind"]]).isin(replaced)
+        table = pd.concat(
+            [table[keep], *(rows for rows in councils.values() if not rows.empty)],
+            ignore_index=True,
+        )
+        table = table.sort_values(["reg", "council"], kind="stable", ignore_index=True)
+
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        pq.write_table(
+            pa.Table.from_pandas(table, schema=INDEX_SCHEMA, preserve_index=False),
+            temp_path,
+        )
+        os.replace(temp_path, path)
+
+
+def upsert_council(
+    records: pd.DataFrame,
+    council: str,
+    kind: str,
+    source: str,
+    path: str = REG_INDEX_PATH,
+) -> int:
+    """
+    Replace a council's rows in the index with newly processed records.
+
+    Args:
+        records (pd.DataFrame): Processed records with some of FINAL_COLUMNS.
+        council (str): Name of the council.
+        kind (str): "pdf" or "excel".
+        source (str): Name of the file the records were processed from.
+        path (str): Path of the index Parquet file.
+
+    Returns:
+        int: Number of rows indexed for the council.
+    """
+    rows = index_rows(records, council, kind, source)
+    upsert_councils({(council, kind): rows}, path)
+    return len(rows)
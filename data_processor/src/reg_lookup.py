@@ -0,0 +1,40 @@
+import streamlit as st
+from reg_index import load_index
+from variables import REG_LOOKUP_MAX_ROWS
+
+
+def app() -> None:
+    """
+    Main application function for Vehicle Lookup page.
+    """
+    st.title("Vehicle Lookup")
+
+    index = load_index()
+    st.write(
+        f"{len(index.table)} records from "
+        f"{index.table[['council', 'kind']].drop_duplicates().shape[0]} council files."
+    )
+
+    reg = st.text_input("Registration:")
+    prefix = st.checkbox("Match registrations starting with this")
+
+    if reg:
+        if prefix:
+            results = index.prefix(reg, limit=REG_LOOKUP_MAX_ROWS + 1)
+        else:
+            results = index.lookup(reg)
+
+        if results.empty:
+            st.write("No councils have licensed this vehicle.")
+            return
+
+        if len(results) > REG_LOOKUP_MAX_ROWS:
+            st.warning(f"Showing the first {REG_LOOKUP_MAX_ROWS} matches.")
+            results = results.iloc[:REG_LOOKUP_MAX_ROWS]
+
+        st.write(f"{results['council'].nunique()} councils:")
+        st.dataframe(results, hide_index=True)
+
+
+if __name__ == "__main__":
+    app()
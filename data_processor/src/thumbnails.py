@@ -0,0 +1,92 @@
+import fitz  # PyMuPDF
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+from variables import (
+    THUMBNAIL_CACHE_MAX_BYTES,
+    THUMBNAIL_DPI,
+    THUMBNAIL_FORMAT,
+    THUMBNAIL_JPEG_QUALITY,
+)
+
+# Clip rectangle (x0, y0, x1, y1) in PDF points
+Clip = Tuple[float, float, float, float]
+
+_thumbnails: "OrderedDict[Hashable, bytes]" = OrderedDict()
+_thumbnail_bytes = 0
+_page_counts: Dict[str, int] = {}
+_lock = threading.Lock()
+
+
+def page_count(pdf_bytes: bytes, pdf_hash: str) -> int:
+    """
+    Get the number of pages in a PDF, memoized by content hash.
+
+    Args:
+        pdf_bytes (bytes): The PDF file content in bytes.
+        pdf_hash (str): SHA-256 of the PDF content.
+
+    Returns:
+        int: Number of pages.
+    """
+    with _lock:
+        if pdf_hash in _page_counts:
+            return _page_counts[pdf_hash]
+
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as pdf:
+        num_pages = pdf.page_count
+
+    with _lock:
+        _page_counts[pdf_hash] = num_pages
+    return num_pages
+
+
+def render_page(
+    pdf_bytes: bytes,
+    pdf_hash: str,
+    page_number: int,
+    dpi: int = THUMBNAIL_DPI,
+    image_format: str = THUMBNAIL_FORMAT,
+    clip: Optional[Clip] = None,
+) -> bytes:
+    """
+    Render one page of a PDF to an encoded image, memoized with LRU eviction.
+
+    Args:
+        pdf_bytes (bytes): The PDF file content in bytes.
+        pdf_hash (str): SHA-256 of the PDF content.
+        page_number (int): Page to render (1-based).
+        dpi (int): Resolution to render at.
+        image_format (str): "png" or "jpeg".
+        clip (Optional[Clip]): Area of the page to render, in PDF points.
+
+    Returns:
+        bytes: The encoded image.
+    """
+    global _thumbnail_bytes
+
+    key = (pdf_hash, page_number, dpi, image_format, clip)
+    with _lock:
+        if key in _thumbnails:
+            _thumbnails.move_to_end(key)
+            return _thumbnails[key]
+
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as pdf:
+        page = pdf.load_page(page_number - 1)
+        pix = page.get_pixmap(
+            dpi=dpi, clip=fitz.Rect(clip) if clip is not None else None
+        )
+        if image_format == "jpeg":
+            image = pix.tobytes("jpeg", jpg_quality=THUMBNAIL_JPEG_QUALITY)
+        else:
+            image = pix.tobytes(image_format)
+
+    with _lock:
+        if key not in _thumbnails:
+            _thumbnails[key] = image
+            _thumbnail_bytes += len(image)
+        # Keep the newest image even if it alone is over the limit
+        while _thumbnail_bytes > THUMBNAIL_CACHE_MAX_BYTES and len(_thumbnails) > 1:
+            _, evicted = _thumbnails.popitem(last=False)
+            _thumbnail_bytes -= len(evicted)
+    return image
@@ -0,0 +1,115 @@
+import streamlit as st
+import io
+import os
+import re
+import tempfile
+import zipfile
+import pandas as pd
+from typing import Hashable, Iterable, Optional, Set, Tuple
+
+
+def normalise_name(name: str) -> str:
+    """
+    Normalise a council or file name for matching.
+
+    Args:
+        name (str): Council or file name.
+
+    Returns:
+        str: The name in lower case with everything but letters and digits removed.
+    """
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+def match_council(file_name: str, councils: Iterable[str]) -> Optional[str]:
+    """
+    Match an uploaded file to a council by its file name.
+
+    A council whose name equals the file name, ignoring case, spaces and
+    punctuation, is preferred. Otherwise the longest council name contained in
+    the file name is used, so "Salford_2024.pdf" matches Salford.
+
+    Args:
+        file_name (str): Name of the uploaded file.
+        councils (Iterable[str]): Council names to match against.
+
+    Returns:
+        Optional[str]: The matching council, or None if no council matches.
+    """
+    key = normalise_name(os.path.splitext(os.path.basename(file_name))[0])
+    by_key = {normalise_name(council): council for council in councils}
+    if key in by_key:
+        return by_key[key]
+
+    matches = [council for name, council in by_key.items() if name and name in key]
+    return max(matches, key=len) if matches else None
+
+
+def write_zip(outputs: Iterable[Tuple[str, pd.DataFrame]], zip_file) -> None:
+    """
+    Write DataFrames as CSV files into a ZIP archive, one at a time.
+
+    Each CSV is compressed as it is written, so no CSV is ever held in memory
+    as a whole.
+    Repeated file names get a number appended, so no file is overwritten.
+
+    Args:
+        outputs (Iterable[Tuple[str, pd.DataFrame]]): File name and DataFrame
+            of each CSV file.
+        zip_file: Path or binary file object to write the archive to.
+    """
+    with zipfile.ZipFile(zip_file, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        names: Set[str] = set()
+        for file_name, df in outputs:
+            stem, extension = os.path.splitext(file_name)
+            number = 1
+            while file_name in names:
+                number += 1
+                file_name = f"{stem}_{number}{extension}"
+            names.add(file_name)
+
+            with archive.open(file_name, "w") as entry:
+                with io.TextIOWrapper(entry, encoding="utf-8", newline="") as text:
+                    df.to_csv(text, index=False)
+
+
+def download_zip(
+    label: str,
+    outputs: Iterable[Tuple[str, pd.DataFrame]],
+    file_name: str,
+    key: Optional[Hashable] = None,
+) -> None:
+    """
+    Create a download button for a ZIP archive of CSV files.
+
+    The archive is written to a temporary file, so only the compressed archive
+    is read into memory for the download. Given a key, the archive and its
+    name are kept in session state, and reruns with the same key reuse them
+    instead of writing the archive again.
+
+    Args:
+        label (str): Label for the download button.
+        outputs (Iterable[Tuple[str, pd.DataFrame]]): File name and DataFrame
+            of each CSV file. Not read when the archive is reused.
+        file_name (str): Name of the downloaded archive.
+        key (Optional[Hashable]): Identifies the outputs, such as the ids of
+            the jobs that produced them.
+    """
+    state_key = f"download_zip_{label}"
+    if key is not None and st.session_state.get(state_key, (None,))[0] == key:
+        _, data, file_name = st.session_state[state_key]
+    else:
+        fd, path = tempfile.mkstemp(suffix=".zip")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write_zip(outputs, f)
+            with open(path, "rb") as f:
+                data = f.read()
+        finally:
+            os.remove(path)
+        if key is not None:
+            st.session_state[state_key] = (key, data, file_name)
+
+    st.download_button(
+        label=label, data=data, file_name=file_name, mime="application/zip"
+    )
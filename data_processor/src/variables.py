@@ -1 +1,120 @@
+import os
+import tempfile
+
 AWS_PRESIGNED_URL = "https://vehicle-ancestry-bucket-905418370160.s3.amazonaws.com"
+
+# Columns kept in processed output, in output order
+FINAL_COLUMNS = ["reg", "make", "model", "date_from", "date_to"]
+
+# Number of worker processes used to extract words from a PDF in parallel
+PDF_EXTRACT_WORKERS = os.cpu_count() or 1
+
+# Documents with fewer pages than this are extracted serially, since the cost of
+# starting the process pool would outweigh the gain
+PDF_PARALLEL_MIN_PAGES = 8
+
+# Word extraction backends a council can choose in pdf_config.csv
+PDF_BACKENDS = ["pdfplumber", "pymupdf"]
+
+# Backend used by councils that do not choose one
+DEFAULT_PDF_BACKEND = "pdfplumber"
+
+# Number of processed rows buffered before a streamed PDF is written to disk
+PDF_STREAM_BATCH_ROWS = 1000
+
+# Ways a council's words can be split into records: at each run of the
+# unique identifier in document order, or at each line band containing it
+ROW_MODES = ["identifier", "line_bands"]
+
+# Row mode used by councils that do not choose one
+DEFAULT_ROW_MODE = "identifier"
+
+# Words whose tops are within this many points of the previous word's top,
+# in top to bottom order, are on the same line band
+LINE_BAND_TOLERANCE = 3
+
+# Number of pages, spread evenly through a PDF, sampled to infer gridlines
+GRIDLINE_SAMPLE_PAGES = 5
+
+# Width in points of the bins of the word edge histogram
+GRIDLINE_BIN_WIDTH = 1
+
+# Narrowest gap in points between two columns; narrower gaps are spaces
+# within a column
+GRIDLINE_MIN_GAP = 3
+
+# Lines with no gap between words at least this wide in points are prose
+# rather than table rows, and are ignored when inferring gridlines
+GRIDLINE_TABLE_GAP = 10
+
+# Bins covered by fewer words than this fraction of the most covered bin are
+# gaps between columns
+GRIDLINE_GUTTER_FRACTION = 0.05
+
+# Number of the most common words shown for each inferred column
+GRIDLINE_EXAMPLES = 3
+
+# Rows per page offered in table previews. Only the page shown is sent to the
+# browser; the full table stays on the server for download
+PREVIEW_PAGE_SIZES = [50, 200, 1000]
+
+# Number of distinct date strings whose parsed value is kept for each council
+DATE_CACHE_MAX_ENTRIES = 100_000
+
+# Seconds a downloaded config file is used before it is revalidated with the bucket
+CONFIG_TTL_SECONDS = 300
+
+# Seconds to wait for the bucket before falling back to the local config copy
+CONFIG_REQUEST_TIMEOUT = 10
+
+# Directory holding the last known copy of each config file
+CONFIG_CACHE_DIR = os.path.join(tempfile.gettempdir(), "vehicle-ancestry-config")
+
+# Directory caching extracted words and processed tables, keyed by PDF content hash
+EXTRACTION_CACHE_DIR = os.path.join(
+    tempfile.gettempdir(), "vehicle-ancestry-extraction"
+)
+
+# Version of the extraction and record processing stages, part of the key of
+# cached processed tables and of words extracted from a region or with another
+# backend. Bump it when a change to the stages alters their output.
+PIPELINE_VERSION = 2
+
+# Size above which the least recently used cache entries are deleted
+EXTRACTION_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# Uploaded PDFs larger than this are written to a private temporary file for
+# extraction, rather than being read from memory
+PDF_SPILL_THRESHOLD_BYTES = 16 * 1024 * 1024
+
+# Resolution, image format and JPEG quality of PDF page previews
+THUMBNAIL_DPI = 72
+THUMBNAIL_FORMAT = "jpeg"
+THUMBNAIL_JPEG_QUALITY = 80
+
+# Total size of rendered page previews kept in memory
+THUMBNAIL_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Number of background processing jobs run at once, shared by every session
+JOB_WORKERS = 2
+
+# Number of jobs that may wait for a worker before new jobs are refused
+JOB_MAX_PENDING = 32
+
+# Seconds a finished job's result is kept for its session to fetch
+JOB_RESULT_TTL_SECONDS = 3600
+
+# Seconds between refreshes of a running job's progress
+JOB_POLL_SECONDS = 0.5
+
+# Merged index of every processed council output, keyed by registration
+REG_INDEX_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..",
+    "..",
+    "output",
+    "reg_index.parquet",
+)
+
+# Maximum number of matches shown for a registration prefix lookup
+REG_LOOKUP_MAX_ROWS = 1000